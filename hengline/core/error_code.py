@@ -13,6 +13,15 @@ class ErrorCode(Enum):
     NOT_FOUND = (1003, "资源未找到")
     INTERNAL_ERROR = (5000, "服务器内部错误")
 
+    # 工作流执行相关，message中的{}占位符由调用方填充
+    RUNNER_INIT_FAILED = (2001, "无法初始化工作流运行器")
+    COMFYUI_UNAVAILABLE = (2002, "无法连接到ComfyUI服务器，请确保服务器已启动")
+    WORKFLOW_NOT_FOUND = (2003, "未找到{}工作流文件")
+    WORKFLOW_LOAD_FAILED = (2004, "工作流加载失败")
+    IMAGE_UPLOAD_FAILED = (2005, "图片上传失败")
+    INVALID_IMAGE_PATH = (2006, "无效的图片路径: {}")
+    WORKFLOW_EXECUTE_FAILED = (2007, "执行{}工作流时出错: {}")
+
     def __init__(self, code, message):
         self._code = code
         self._message = message
@@ -72,6 +72,10 @@ UPLOAD_FOLDER = os.path.join(project_root, get_temp_folder())
 OUTPUT_FOLDER = os.path.join(project_root, get_output_folder())
 TEMP_FOLDER = os.path.join(project_root, 'temp')  # 使用固定的临时目录
 
+# 结果页按扩展名判断文件类型（ogg 同时属于视频和音频）
+VIDEO_EXTENSIONS = frozenset({'mp4', 'webm', 'ogg'})
+AUDIO_EXTENSIONS = frozenset({'mp3', 'wav', 'ogg', 'flac', 'aac'})
+
 # 全局变量存储任务队列管理器
 from hengline.task.task_monitor import task_monitor
 # 导入启动任务监听器
@@ -140,9 +144,9 @@ def result():
         return redirect(url_for('index'))
 
     # 根据文件类型判断是图像、视频还是音频
-    file_ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
-    is_video = file_ext in ['mp4', 'webm', 'ogg']
-    is_audio = file_ext in ['mp3', 'wav', 'ogg', 'flac', 'aac']
+    file_ext = filename.rpartition('.')[2].lower() if '.' in filename else ''
+    is_video = file_ext in VIDEO_EXTENSIONS
+    is_audio = file_ext in AUDIO_EXTENSIONS
 
     # 获取当前时间
     current_time = datetime.datetime.now()
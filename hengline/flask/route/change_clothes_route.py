@@ -99,7 +99,9 @@ def api_change_clothes():
             cfg=request.form.get('cfg'),
             denoise=request.form.get('denoise'),
             batch_size=request.form.get('batch_size'),
-            sampler_name=request.form.get('sampler_name')
+            sampler_name=request.form.get('sampler_name'),
+            # 图片已由save_uploaded_file保存并校验，执行时无需再次检查文件是否存在
+            image_validated=True
         )
 
         if result:
@@ -6,7 +6,6 @@
 @Time: 2025/08 - 2025/11
 """
 
-import json
 import os
 import sys
 
@@ -18,11 +17,15 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # 导入工作流管理器
 # 导入配置工具
 from utils.config_utils import get_config, get_comfyui_api_url, get_settings_config, \
-    reload_config, get_user_configs, get_comfyui_config
+    reload_config, get_user_configs, get_comfyui_config, write_json_file, _get_config_path
 
 # 创建Blueprint
 config_bp = Blueprint('config', __name__)
 
+# 配置文件路径在导入时获取一次，并确保配置目录存在
+CONFIG_PATH = _get_config_path()
+os.makedirs(os.path.dirname(CONFIG_PATH), exist_ok=True)
+
 
 @config_bp.route('/config', methods=['GET', 'POST'])
 def configure():
@@ -241,18 +244,8 @@ def configure():
         image_to_video_params['negative_prompt'] = request.form.get('settings[image_to_video][negative_prompt]',
                                                                     image_to_video_params.get('negative_prompt', ''))
 
-        # 使用config_utils中的函数获取正确的配置路径
-        from utils.config_utils import _get_config_path
-        config_path = _get_config_path()
-        config_dir = os.path.dirname(config_path)
-        
-        # 确保配置目录存在
-        if not os.path.exists(config_dir):
-            os.makedirs(config_dir)
-
         # 保存配置到文件
-        with open(config_path, 'w', encoding='utf-8') as f:
-            json.dump(current_config, f, ensure_ascii=False, indent=2)
+        write_json_file(CONFIG_PATH, current_config)
 
         # 使用新的预设配置函数保存工作流预设
         from utils.config_utils import save_workflow_preset
@@ -429,16 +422,8 @@ def api_config():
                         'message': '\n'.join(validation_errors)
                     }), 400
 
-            # 确保配置目录存在
-            config_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
-                                      'configs')
-            if not os.path.exists(config_dir):
-                os.makedirs(config_dir)
-
-            # 保存配置到文件
-            config_path = os.path.join(config_dir, 'config.json')
-            with open(config_path, 'w', encoding='utf-8') as f:
-                json.dump(current_config, f, ensure_ascii=False, indent=2)
+            # 保存配置到文件（与load_config读取的是同一个文件）
+            write_json_file(CONFIG_PATH, current_config)
 
             # 重新加载配置
             reload_config()
@@ -10,11 +10,13 @@ import json
 import os
 import sys
 import time
+import traceback
 
 from flask import Blueprint, request, jsonify
 
 # 导入日志模块
 from hengline.logger import debug, info, error
+from utils.config_utils import write_json_file
 
 # 添加项目根目录到Python路径
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -52,8 +54,7 @@ def load_workflow_presets():
 def save_workflow_presets(config):
     """保存工作流预设配置文件"""
     try:
-        with open(WORKFLOW_PRESETS_CONFIG, 'w', encoding='utf-8') as f:
-            json.dump(config, f, ensure_ascii=False, indent=2)
+        write_json_file(WORKFLOW_PRESETS_CONFIG, config)
         return True
     except Exception as e:
         error(f"保存工作流预设配置文件失败: {e}")
@@ -263,6 +264,5 @@ def set_workflow():
             return jsonify({'success': False, 'message': '保存工作流配置失败'}), 500
     except Exception as e:
         error(f"设置工作流配置失败: {e}")
-        import traceback
         traceback.print_exc()
         return jsonify({'success': False, 'message': f'设置失败: {str(e)}'}), 500
\ No newline at end of file
@@ -278,42 +278,49 @@ class Logger:
             # 如果导入失败，保持默认设置
             pass
     
-    def debug(self, message: str):
-        """记录调试信息"""
-        self.logger.debug(message)
+    def debug(self, message: str, *args):
+        """记录调试信息，args非空时按%格式延迟格式化"""
+        self.logger.debug(message, *args)
     
-    def info(self, message: str):
-        """记录一般信息"""
-        self.logger.info(message)
+    def info(self, message: str, *args):
+        """记录一般信息，args非空时按%格式延迟格式化"""
+        self.logger.info(message, *args)
     
-    def warning(self, message: str):
-        """记录警告信息"""
-        self.logger.warning(message)
+    def warning(self, message: str, *args):
+        """记录警告信息，args非空时按%格式延迟格式化"""
+        self.logger.warning(message, *args)
     
-    def error(self, message: str):
-        """记录错误信息"""
-        self.logger.error(message)
+    def error(self, message: str, *args):
+        """记录错误信息，args非空时按%格式延迟格式化"""
+        self.logger.error(message, *args)
     
-    def critical(self, message: str):
-        """记录严重错误信息"""
-        self.logger.critical(message)
+    def critical(self, message: str, *args):
+        """记录严重错误信息，args非空时按%格式延迟格式化"""
+        self.logger.critical(message, *args)
+
+    def is_debug_enabled(self) -> bool:
+        """是否启用了DEBUG级别日志，用于跳过开销较大的调试信息构造"""
+        return self.logger.isEnabledFor(logging.DEBUG)
 
 # 创建全局日志实例
 logger = Logger(name="hengline")
 
 # 方便使用的函数
 
-def debug(message: str):
-    logger.debug(message)
+def debug(message: str, *args):
+    logger.debug(message, *args)
+
+def info(message: str, *args):
+    logger.info(message, *args)
 
-def info(message: str):
-    logger.info(message)
+def warning(message: str, *args):
+    logger.warning(message, *args)
 
-def warning(message: str):
-    logger.warning(message)
+def error(message: str, *args):
+    logger.error(message, *args)
 
-def error(message: str):
-    logger.error(message)
+def critical(message: str, *args):
+    logger.critical(message, *args)
 
-def critical(message: str):
-    logger.critical(message)
\ No newline at end of file
+def is_debug_enabled() -> bool:
+    return logger.is_debug_enabled()
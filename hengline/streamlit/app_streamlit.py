@@ -15,8 +15,11 @@ import sys
 
 import streamlit as st
 
+# 项目根目录在导入时计算一次
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 # 添加项目根目录到Python路径
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.append(_PROJECT_ROOT)
 
 # 导入自定义日志模块
 from hengline.logger import debug
@@ -33,6 +36,32 @@ from hengline.streamlit.templates.image_to_image_tab import ImageToImageTab
 from hengline.streamlit.templates.image_to_video_tab import ImageToVideoTab
 from hengline.streamlit.templates.text_to_video_tab import TextToVideoTab
 
+# 标签页名称 -> 标签页类，按显示顺序排列
+TAB_CLASSES = {
+    "文生图": TextToImageTab,
+    "图生图": ImageToImageTab,
+    "图生视频": ImageToVideoTab,
+    "文生视频": TextToVideoTab,
+}
+
+@st.cache_resource(show_spinner=False)
+def _get_runner(output_dir: str, api_url: str) -> ComfyUIRunner:
+    """
+    获取进程内共享的ComfyUIRunner实例，所有浏览器会话复用同一个运行器，不再为每个新会话重新创建；
+    缓存按输出目录和API URL区分，修改API URL后取到的是新的实例，不会改动其他会话正在使用的运行器
+
+    Args:
+        output_dir: 输出目录
+        api_url: ComfyUI API URL
+
+    Returns:
+        ComfyUIRunner: 运行器实例
+    """
+    debug(f"初始化ComfyUIRunner，API URL: {api_url}, 输出目录: {output_dir}")
+    # ComfyUIRunner初始化时会确保输出目录存在
+    return ComfyUIRunner(output_dir, api_url)
+
+
 class AIGCWebApp:
     """AIGC应用的Web界面类"""
     
@@ -45,39 +74,22 @@ class AIGCWebApp:
             layout="wide"
         )
         
-        # 初始化会话状态
-        if "runner" not in st.session_state:
+        # 初始化会话状态；配置中的API URL变化后（例如在其他会话中修改），换用对应新URL的共享实例
+        current_api_url = get_comfyui_api_url()
+        runner = st.session_state.get("runner")
+        if runner is None:
             # 使用配置工具获取输出目录配置
             output_folder = get_paths_config().get("output_folder", "outputs")
-            
-            # 获取当前文件绝对路径
-            current_file = os.path.abspath(__file__)
-            debug(f"当前文件路径: {current_file}")
-            
-            # 计算项目根目录（确保正确指向e:/Projects/blogs/ai-diffusion-aigc）
-            project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_file)))
-            debug(f"计算的项目根目录: {project_root}")
-            
+
             # 设置输出目录到项目根目录
-            output_dir = os.path.join(project_root, output_folder)
+            output_dir = os.path.join(_PROJECT_ROOT, output_folder)
             debug(f"最终输出目录: {output_dir}")
-            
-            # 获取ComfyUI API URL配置
-            api_url = get_comfyui_api_url()
-            debug(f"初始化ComfyUIRunner，API URL: {api_url}, 输出目录: {output_dir}")
-            
-            # 创建并保存ComfyUIRunner实例
-            st.session_state.runner = ComfyUIRunner(output_dir, api_url)
-            
-            # 验证输出目录是否存在，如果不存在则创建
-            os.makedirs(output_dir, exist_ok=True)
-            debug(f"已确保输出目录存在: {output_dir}")
-        else:
-            # 更新现有runner的API URL
-            current_api_url = get_comfyui_api_url()
-            if st.session_state.runner.api_url != current_api_url:
-                debug(f"更新ComfyUI API URL: 从 {st.session_state.runner.api_url} 到 {current_api_url}")
-                st.session_state.runner.api_url = current_api_url
+
+            # 获取共享的ComfyUIRunner实例并保存到会话状态
+            st.session_state.runner = _get_runner(output_dir, current_api_url)
+        elif runner.api_url != current_api_url:
+            debug(f"更新ComfyUI API URL: 从 {runner.api_url} 到 {current_api_url}")
+            st.session_state.runner = _get_runner(runner.output_dir, current_api_url)
 
     def _configure_comfyui(self) -> None:
         """配置ComfyUI相关参数"""
@@ -98,9 +110,10 @@ class AIGCWebApp:
                 if current_api_url != new_api_url:
                     # 保存配置到文件
                     if save_comfyui_config(api_url=new_api_url):
-                        # 更新会话状态中的runner的API URL
-                        debug(f"更新ComfyUI API URL: 从 {st.session_state.runner.api_url} 到 {new_api_url}")
-                        st.session_state.runner.api_url = new_api_url
+                        # 换用新API URL对应的共享runner，不修改其他会话仍在使用的旧实例
+                        runner = st.session_state.runner
+                        debug(f"更新ComfyUI API URL: 从 {runner.api_url} 到 {new_api_url}")
+                        st.session_state.runner = _get_runner(runner.output_dir, new_api_url)
                         st.success("ComfyUI API URL已成功保存并应用！")
                     else:
                         st.error("保存配置失败，请检查文件权限。")
@@ -121,37 +134,15 @@ class AIGCWebApp:
         # 配置ComfyUI
         self._configure_comfyui()
         
-        # 创建标签页
-        tabs = st.tabs([
-            "文生图", 
-            "图生图", 
-            "图生视频",
-            "文生视频"
-        ])
+        # 选择标签页：st.tabs 会在每次重新运行时执行全部标签页的内容，这里只构建并渲染当前选中的一个
+        active_tab = st.radio("功能", list(TAB_CLASSES), horizontal=True, key="active_tab",
+                              label_visibility="collapsed")
         
         # 确保ComfyUI运行器已初始化
         if 'runner' not in st.session_state:
             return
         
-        # 文生图标签页
-        with tabs[0]:
-            text_to_image_tab = TextToImageTab(st.session_state.runner)
-            text_to_image_tab.render()
-        
-        # 图生图标签页
-        with tabs[1]:
-            image_to_image_tab = ImageToImageTab(st.session_state.runner)
-            image_to_image_tab.render()
-        
-        # 图生视频标签页
-        with tabs[2]:
-            image_to_video_tab = ImageToVideoTab(st.session_state.runner)
-            image_to_video_tab.render()
-        
-        # 文生视频标签页
-        with tabs[3]:
-            text_to_video_tab = TextToVideoTab(st.session_state.runner)
-            text_to_video_tab.render()
+        TAB_CLASSES[active_tab](st.session_state.runner).render()
 
 if __name__ == "__main__":
     # 启动任务监听器，处理历史未完成任务
@@ -1,7 +1,62 @@
+import io
 import streamlit as st
 import os
 from typing import List, Union, Optional
 
+from PIL import Image, UnidentifiedImageError
+
+from hengline.logger import warning
+
+
+@st.cache_data(show_spinner=False, max_entries=8, ttl=600)
+def _read_file_bytes(file_path: str, mtime_ns: int) -> bytes:
+    """
+    读取图像文件内容，按(路径, 修改时间)缓存，重新运行页面时不再重复读取同一个结果文件；
+    缓存在进程内所有会话间共享，因此只保留少量最近的图像，并在10分钟后过期。视频文件不经过该缓存
+    """
+    with open(file_path, "rb") as file:
+        return file.read()
+
+
+def make_thumbnail(data: bytes, max_side: int) -> bytes:
+    """
+    生成长边不超过max_side的JPEG缩略图，用于页面预览，减少浏览器端传输和解码的数据量
+
+    Args:
+        data: 原始图像数据
+        max_side: 缩略图长边的最大像素数
+
+    Returns:
+        bytes: 缩略图数据，无法识别为图像时原样返回
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as im:
+            im.thumbnail((max_side, max_side), Image.LANCZOS)
+            buf = io.BytesIO()
+            im.convert('RGB').save(buf, 'JPEG', quality=85, optimize=True)
+            return buf.getvalue()
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        # 退回为原图时页面会传输完整大小的图像，记录原因以便排查
+        warning(f"生成缩略图失败，使用原图显示: {str(e)}")
+        return data
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _read_thumbnail(file_path: str, mtime_ns: int, max_side: int) -> bytes:
+    """读取图像文件并生成缩略图，按(路径, 修改时间, 尺寸)缓存；原图直接从磁盘读取，不再同时缓存一份原图"""
+    with open(file_path, "rb") as file:
+        return make_thumbnail(file.read(), max_side)
+
+
+def _file_bytes(file_path: str) -> Optional[bytes]:
+    """获取文件内容（带缓存），文件不存在时返回None"""
+    try:
+        mtime_ns = os.stat(file_path).st_mtime_ns
+    except OSError:
+        return None
+    return _read_file_bytes(file_path, mtime_ns)
+
+
 class CarouselComponent:
     """轮播组件，用于显示多张图片或视频，并提供下载功能"""
     
@@ -14,12 +69,13 @@ class CarouselComponent:
         # 如果只有一张图片，直接显示
         if len(image_paths) == 1:
             image_path = image_paths[0]
-            if os.path.exists(image_path):
+            image_bytes = _file_bytes(image_path)
+            if image_bytes is not None:
                 col1, col2 = st.columns([4, 1])
                 with col1:
-                    st.image(image_path, caption=caption or "生成结果", use_column_width=True)
+                    st.image(image_bytes, caption=caption or "生成结果", use_column_width=True)
                 with col2:
-                    CarouselComponent._add_download_button(image_path)
+                    CarouselComponent._add_download_button(image_path, image_bytes)
             return
         
         # 多张图片时显示轮播
@@ -44,12 +100,13 @@ class CarouselComponent:
         
         # 显示当前图片
         current_image = image_paths[st.session_state.carousel_index]
-        if os.path.exists(current_image):
+        image_bytes = _file_bytes(current_image)
+        if image_bytes is not None:
             col_img, col_dl = st.columns([4, 1])
             with col_img:
-                st.image(current_image, caption=caption or f"生成结果 #{st.session_state.carousel_index + 1}", use_column_width=True)
+                st.image(image_bytes, caption=caption or f"生成结果 #{st.session_state.carousel_index + 1}", use_column_width=True)
             with col_dl:
-                CarouselComponent._add_download_button(current_image)
+                CarouselComponent._add_download_button(current_image, image_bytes)
         
         # 显示缩略图导航
         CarouselComponent._display_thumbnails(image_paths)
@@ -66,6 +123,7 @@ class CarouselComponent:
             if os.path.exists(video_path):
                 col1, col2 = st.columns([4, 1])
                 with col1:
+                    # 按路径传给st.video，由Streamlit读取文件，视频内容不进入进程内缓存
                     st.video(video_path, format="video/mp4")
                 with col2:
                     CarouselComponent._add_download_button(video_path)
@@ -123,10 +181,13 @@ class CarouselComponent:
         # 显示当前页的缩略图
         for i, idx in enumerate(range(start_idx, end_idx)):
             with cols[i]:
-                image_path = image_paths[idx]
-                if os.path.exists(image_path):
-                    # 显示缩略图
-                    st.image(image_path, width=100)
+                try:
+                    mtime_ns = os.stat(image_paths[idx]).st_mtime_ns
+                except OSError:
+                    mtime_ns = None
+                if mtime_ns is not None:
+                    # 显示缩略图（按显示宽度的2倍生成，兼顾高分屏清晰度）
+                    st.image(_read_thumbnail(image_paths[idx], mtime_ns, 200), width=100)
                     # 添加选择按钮
                     if st.button(f"选择 #{idx + 1}", key=f"select_{idx}"):
                         st.session_state.carousel_index = idx
@@ -146,15 +207,15 @@ class CarouselComponent:
                         st.session_state.thumbnail_page += 1
     
     @staticmethod
-    def _add_download_button(file_path: str):
-        """添加下载按钮"""
-        if not os.path.exists(file_path):
-            return
-        
+    def _add_download_button(file_path: str, file_bytes: Optional[bytes] = None):
+        """添加下载按钮，file_bytes为已读取的文件内容，未提供时（例如视频）直接从磁盘读取，不经过缓存"""
         try:
             # 读取文件内容
-            with open(file_path, "rb") as file:
-                file_bytes = file.read()
+            if file_bytes is None:
+                if not os.path.exists(file_path):
+                    return
+                with open(file_path, "rb") as file:
+                    file_bytes = file.read()
             
             # 获取文件名
             file_name = os.path.basename(file_path)
@@ -0,0 +1,80 @@
+import streamlit as st
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict
+
+
+@st.cache_resource(show_spinner=False)
+def _get_generation_pool() -> ThreadPoolExecutor:
+    """获取进程内共享的生成任务线程池，所有会话共用，限制同时执行的生成任务数"""
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="st-generate")
+
+
+class GenerationJob:
+    """后台生成任务组件：在线程池中执行生成任务，页面脚本不再被长时间阻塞，结果保存在会话状态中"""
+
+    @staticmethod
+    def submit(job_key: str, func: Callable[..., Dict[str, Any]], *args, **kwargs) -> bool:
+        """
+        提交生成任务到后台线程池
+
+        Args:
+            job_key: 会话状态中保存任务的键
+            func: 生成函数，返回包含success、message的结果字典
+            *args: 生成函数的位置参数
+            **kwargs: 生成函数的关键字参数
+
+        Returns:
+            bool: 是否提交成功，同一个键上一个任务仍在执行时返回False，避免重复点击产生重复任务
+        """
+        job = st.session_state.get(job_key)
+        if isinstance(job, Future) and not job.done():
+            return False
+        st.session_state[job_key] = _get_generation_pool().submit(func, *args, **kwargs)
+        return True
+
+    @staticmethod
+    def render(job_key: str, running_text: str, show_result: Callable[[Dict[str, Any]], None]):
+        """
+        显示生成任务的进度或结果
+
+        Args:
+            job_key: 会话状态中保存任务的键
+            running_text: 任务执行中时显示的提示文字
+            show_result: 显示结果的函数
+        """
+        job = st.session_state.get(job_key)
+        if job is None:
+            return
+
+        # 进度提示和结果写入同一个占位区域，任务完成后结果整体替换进度提示，而不是在页面上追加元素
+        with st.empty().container():
+            if isinstance(job, Future):
+                if not job.done():
+                    if hasattr(st, 'fragment'):
+                        GenerationJob._poll(job_key, running_text)
+                        return
+                    # 旧版本Streamlit没有fragment，退回为阻塞等待
+                    with st.spinner(running_text):
+                        wait([job])
+                try:
+                    result = job.result()
+                except Exception as e:
+                    result = {'success': False, 'message': f"处理请求时发生错误: {str(e)}"}
+                # 保存结果，之后的重新运行（例如轮播翻页）仍能显示
+                st.session_state[job_key] = job = result
+
+            show_result(job)
+
+    @staticmethod
+    def _poll(job_key: str, running_text: str):
+        """每秒检查一次任务状态，只重新运行该片段；任务完成后整体刷新页面以显示结果"""
+
+        @st.fragment(run_every=1)
+        def _check():
+            # 其他片段运行可能已把任务替换为结果字典（或被清除），此时同样整体刷新页面
+            job = st.session_state.get(job_key)
+            if not isinstance(job, Future) or job.done():
+                st.rerun()
+            st.info(running_text)
+
+        _check()
@@ -1,17 +1,34 @@
+import functools
+import hashlib
 import os
+import shutil
 import sys
+import tempfile
 from typing import Dict, Any, Optional
 from hengline.workflow.run_workflow import ComfyUIRunner
+from hengline.workflow import workflow_node
 from hengline.logger import error, debug
 from utils.config_utils import get_task_settings, get_workflow_path, get_paths_config
+from utils.file_utils import DEFAULT_FILE_MODE
+
+# 项目根目录在导入时计算一次（使用四次os.path.dirname()指向项目根目录，而不是hengline目录）
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+
+@functools.lru_cache(maxsize=None)
+def _project_dir(folder: str) -> str:
+    """获取项目根目录下的文件夹绝对路径，并确保其存在（每个文件夹只创建一次）"""
+    path = os.path.join(_PROJECT_ROOT, folder)
+    os.makedirs(path, exist_ok=True)
+    return path
+
 
 class BaseInterface:
     def __init__(self, runner: ComfyUIRunner, task_type: str):
         self.runner = runner
         self.task_type = task_type
         self.default_params = get_task_settings(task_type)
-        # 使用四次os.path.dirname()指向项目根目录，而不是hengline目录
-        self.project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+        self.project_root = _PROJECT_ROOT
         
     def load_workflow(self) -> Optional[Dict[str, Any]]:
         """加载工作流文件"""
@@ -27,7 +44,8 @@ class BaseInterface:
                 return None
             
             debug(f"加载工作流文件: {workflow_path}")
-            return self.runner.load_workflow(workflow_path)
+            # 解析结果按(路径, 修改时间)缓存，返回的是本次生成私有的副本
+            return workflow_node.load_workflow(workflow_path)
         except Exception as e:
             error(f"加载工作流失败: {str(e)}")
             return None
@@ -36,7 +54,8 @@ class BaseInterface:
         """更新工作流参数"""
         try:
             debug(f"更新工作流参数: {params}")
-            return self.runner.update_workflow_params(workflow, params)
+            # load_workflow返回的已是私有副本，直接原地更新，不再复制一次
+            return workflow_node.update_workflow_params(workflow, params, copy=False)
         except Exception as e:
             error(f"更新工作流参数失败: {str(e)}")
             return None
@@ -55,8 +74,7 @@ class BaseInterface:
     
     def get_output_path(self, output_filename: str) -> str:
         """获取输出文件路径"""
-        output_folder = get_paths_config().get("output_folder", "outputs")
-        output_dir = os.path.join(self.project_root, output_folder)
+        output_dir = _project_dir(get_paths_config().get("output_folder", "outputs"))
         return os.path.join(output_dir, output_filename)
         
     def get_batch_output_paths(self, output_filename: str, batch_size: int) -> list:
@@ -64,8 +82,7 @@ class BaseInterface:
         if batch_size <= 1:
             return [self.get_output_path(output_filename)]
         
-        output_folder = get_paths_config().get("output_folder", "outputs")
-        output_dir = os.path.join(self.project_root, output_folder)
+        output_dir = _project_dir(get_paths_config().get("output_folder", "outputs"))
         base_name, ext = os.path.splitext(output_filename)
         
         output_paths = []
@@ -96,14 +113,38 @@ class BaseInterface:
             if not uploaded_file:
                 return None
             
-            temp_folder = get_paths_config().get("temp_folder", "temp")
-            temp_dir = os.path.join(self.project_root, temp_folder)
-            os.makedirs(temp_dir, exist_ok=True)
-            
-            temp_image_path = os.path.join(temp_dir, uploaded_file.name)
-            with open(temp_image_path, "wb") as f:
-                f.write(uploaded_file.getbuffer())
-            
+            temp_dir = _project_dir(get_paths_config().get("temp_folder", "temp"))
+            # 以文件内容的BLAKE2b摘要作为临时文件名，重复提交同一张图片时直接复用已保存的文件
+            uploaded_file.seek(0)
+            hasher = hashlib.blake2b(digest_size=16)
+            for chunk in iter(lambda: uploaded_file.read(1024 * 1024), b''):
+                hasher.update(chunk)
+            digest = hasher.hexdigest()
+            ext = os.path.splitext(uploaded_file.name)[1].lower()
+            temp_image_path = os.path.join(temp_dir, f"{digest}{ext}")
+            if os.path.exists(temp_image_path):
+                debug(f"上传图像已存在，复用临时文件: {temp_image_path}")
+                return temp_image_path
+
+            # 按1MB分块流式写入，不再通过getbuffer()一次性取出整个文件；先回到开头，避免重新运行后读取位置不在起点
+            # 先写入唯一命名的临时文件再重命名，避免写入中断后留下按摘要命名的不完整文件被后续复用，
+            # 同时提交同一张图片的多个任务也不会写入同一个临时文件
+            uploaded_file.seek(0)
+            out = tempfile.NamedTemporaryFile(dir=temp_dir, suffix='.part', delete=False)
+            try:
+                with out:
+                    shutil.copyfileobj(uploaded_file, out, length=1024 * 1024)
+                if os.path.exists(temp_image_path):
+                    # 其他任务已经写入了相同内容的文件，直接复用
+                    os.remove(out.name)
+                else:
+                    os.chmod(out.name, DEFAULT_FILE_MODE)
+                    os.replace(out.name, temp_image_path)
+            except BaseException:
+                if os.path.exists(out.name):
+                    os.remove(out.name)
+                raise
+
             return temp_image_path
         except Exception as e:
             error(f"保存上传图像失败: {str(e)}")
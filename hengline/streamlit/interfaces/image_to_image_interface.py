@@ -1,3 +1,4 @@
+import traceback
 from typing import Dict, Any, Optional
 from hengline.workflow.run_workflow import ComfyUIRunner
 from hengline.logger import debug, error
@@ -76,7 +77,6 @@ class ImageToImageInterface(BaseInterface):
             result['output_paths'] = output_paths  # 添加批量输出路径
             
         except Exception as e:
-            import traceback
             error_type = type(e).__name__
             error_message = str(e)
             error_traceback = traceback.format_exc()
@@ -6,11 +6,12 @@
 import json
 import os
 import sys
+import traceback
 from typing import Dict, Any
 
 import requests
 
-from hengline.logger import debug, info, error, warning
+from hengline.logger import debug, info, error, warning, is_debug_enabled
 from utils.config_utils import get_task_config
 from hengline.workflow.workflow_comfyui import comfyui_api
 
@@ -72,7 +73,7 @@ class ComfyUIRunnerManager:
                 error("转换后的工作流为空")
                 return {"success": False, "message": "转换后的工作流为空"}
 
-            info(f"准备发送工作流到ComfyUI API. comfyui_workflow= {comfyui_workflow}")
+            info("准备发送工作流到ComfyUI API. comfyui_workflow= %s", comfyui_workflow)
             # 发送工作流到ComfyUI API
             prompt_data = {
                 "prompt": comfyui_workflow,
@@ -156,6 +157,6 @@ class ComfyUIRunnerManager:
         except Exception as e:
             error(f"工作流运行失败: {str(e)}")
             # 添加堆栈跟踪以帮助调试
-            import traceback
-            debug(f"异常详情: {traceback.format_exc()}")
+            if is_debug_enabled():
+                debug("异常详情: %s", traceback.format_exc())
             return {"success": False, "message": f"工作流运行失败: {str(e)}"}
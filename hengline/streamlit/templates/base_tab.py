@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+标签页基类模块，按各标签页声明的参数规格统一构建表单、提交后台任务并显示结果
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple, Union
+
+import streamlit as st
+
+from hengline.logger import debug
+from hengline.streamlit.components.carousel_component import CarouselComponent, make_thumbnail
+from hengline.streamlit.components.generation_job import GenerationJob
+
+Number = Union[int, float]
+
+# 上传图像预览的长边像素上限
+PREVIEW_MAX_SIDE = 1024
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _upload_preview(upload_key: str, _uploaded_file) -> bytes:
+    """
+    生成上传图像的预览缩略图，按上传文件的标识缓存，重新运行页面时不再重复解码原图
+
+    Args:
+        upload_key: 上传文件的唯一标识，作为缓存键
+        _uploaded_file: 上传的文件（参数名以下划线开头，不参与缓存键的哈希）
+
+    Returns:
+        bytes: 预览图数据
+    """
+    return make_thumbnail(_uploaded_file.getvalue(), PREVIEW_MAX_SIDE)
+
+
+@dataclass(frozen=True)
+class SliderField:
+    """表单中的一个滑块参数"""
+    name: str  # 传给生成方法的参数名
+    label: str  # 滑块标签
+    min_value: Number
+    max_value: Number
+    default: Number  # 默认配置中没有该参数时使用的初始值
+    step: Number  # 为浮点数时初始值会显式转换为float，解决类型不匹配问题
+    config_key: Optional[str] = None  # 默认配置中的键，未指定时与name相同
+
+
+class BaseTab:
+    """
+    生成标签页基类，子类只需声明以下类属性：
+    param_rows 按行声明参数区域，每行是若干列，每列是若干个滑块；只有一列的行直接占满整行
+    """
+
+    interface_class = None  # 接口类
+    generate_method = ''  # 接口中生成方法的名称
+    task_type = ''  # 任务类型，同时用作表单、后台任务的键和输出文件名前缀
+    title = ''  # 标签页标题
+    media_name = '图像'  # 生成内容的名称，用于提示词输入框的说明
+    is_video = False  # 输出是否为视频，决定输出文件扩展名和结果的显示方式
+    needs_image = False  # 是否需要上传输入图像
+    submit_text = '生成图像'  # 提交按钮文字
+    running_text = '正在生成图像...'  # 生成中的提示文字
+    param_rows: Tuple[Tuple[Tuple[SliderField, ...], ...], ...] = ()
+
+    def __init__(self, runner):
+        """初始化标签页"""
+        self.runner = runner
+        # 创建接口实例
+        self.interface = self.interface_class(runner)
+        self.default_params = self.interface.default_params
+
+    def render(self):
+        """渲染标签页"""
+        debug(f"====== 进入[{self.title}]标签页 ======")
+        st.subheader(self.title)
+
+        # 创建表单
+        with st.form(f"{self.task_type}_form"):
+            # 获取默认配置
+            with st.expander("默认配置", expanded=False):
+                st.write("当前使用的默认配置参数")
+                st.json(self.default_params)
+
+            params = {}
+            # 图像上传
+            if self.needs_image:
+                params['uploaded_file'] = st.file_uploader("上传图像", type=["jpg", "jpeg", "png", "webp"])
+
+            # 输入区域
+            params.update(self._render_prompts())
+
+            # 参数设置
+            for row in self.param_rows:
+                if len(row) == 1:
+                    params.update(self._render_sliders(row[0]))
+                    continue
+                for column, fields in zip(st.columns(len(row)), row):
+                    with column:
+                        params.update(self._render_sliders(fields))
+
+            # 自动生成输出文件名
+            output_ext = '.mp4' if self.is_video else '.png'
+            params['output_filename'] = f"{self.task_type}_{time.time_ns() // 1_000_000_000}{output_ext}"
+
+            # 提交按钮
+            submit_button = st.form_submit_button(self.submit_text)
+
+        # 显示上传的图像（使用缓存的缩略图）
+        uploaded_file = params.get('uploaded_file')
+        if uploaded_file is not None:
+            upload_key = getattr(uploaded_file, 'file_id', None) or f"{uploaded_file.name}:{uploaded_file.size}"
+            st.image(_upload_preview(upload_key, uploaded_file), caption="上传的图像", use_container_width=True)
+
+        # 处理表单提交：生成任务在后台线程中执行，不阻塞页面；上一个任务未完成时不重复提交
+        job_key = f"{self.task_type}_job"
+        if submit_button and not GenerationJob.submit(job_key, getattr(self.interface, self.generate_method), **params):
+            st.warning("上一个生成任务仍在进行中，请稍候...")
+
+        # 显示生成进度或结果
+        GenerationJob.render(job_key, self.running_text, self._show_result)
+
+    def _render_prompts(self) -> dict:
+        """渲染提示词和负面提示词输入框"""
+        media_name = self.media_name
+        prompt = st.text_area(f"提示词 (Prompt) (描述你想要生成的{media_name}内容)",
+                              value=self.default_params.get('prompt', ''),
+                              placeholder=f"描述你想要生成的{media_name}内容...", height=150)
+        negative_prompt = st.text_area(f"负面提示词 (Negative Prompt) (描述你不想要在{media_name}中出现的内容)",
+                                       value=self.default_params.get('negative_prompt', ''),
+                                       placeholder=f"描述你不想要在{media_name}中出现的内容...", height=100)
+        return {'prompt': prompt, 'negative_prompt': negative_prompt}
+
+    def _render_sliders(self, fields: Tuple[SliderField, ...]) -> dict:
+        """按顺序渲染一组滑块，返回参数名到取值的映射"""
+        values = {}
+        for field in fields:
+            value = self.default_params.get(field.config_key or field.name, field.default)
+            if isinstance(field.step, float):
+                value = float(value)
+            values[field.name] = st.slider(field.label, min_value=field.min_value, max_value=field.max_value,
+                                           value=value, step=field.step)
+        return values
+
+    def _show_result(self, result):
+        """显示生成结果"""
+        if result['success']:
+            st.success(result['message'])
+
+            # 显示生成结果
+            with st.expander("生成结果"):
+                # 使用轮播组件显示多个结果
+                display_carousel = (CarouselComponent.display_video_carousel if self.is_video
+                                    else CarouselComponent.display_image_carousel)
+                if 'output_paths' in result and len(result['output_paths']) > 0:
+                    display_carousel(result['output_paths'], caption="生成结果")
+                elif result['output_path']:
+                    # 兼容旧版返回格式
+                    display_carousel([result['output_path']], caption="生成结果")
+        else:
+            st.error(result['message'])
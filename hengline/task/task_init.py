@@ -30,7 +30,7 @@ from hengline.task.task_manage import task_queue_manager
 # 导入邮件发送模块
 from hengline.task.task_email import async_send_failure_email
 # 导入工作流状态检查器
-from hengline.workflow.workflow_status_checker import workflow_status_checker
+from hengline.workflow.workflow_status_checker import get_workflow_status_checker
 
 # 导入SocketIO路由模块，用于WebSocket初始化
 from hengline.flask.route.socketio_route import init_socketio
@@ -173,7 +173,7 @@ class StartupTaskListener(TaskBase):
 
             # 加入异步结果检查
             debug(f"将任务 {task_id} 加入异步结果检查，prompt_id: {task.prompt_id}")
-            workflow_status_checker.check_workflow_status_async(
+            get_workflow_status_checker().check_workflow_status_async(
                 prompt_id=task.prompt_id,
                 output_name=generate_output_filename(task_type),
                 api_url=self.comfyui_api_url,
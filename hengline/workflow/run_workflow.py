@@ -8,20 +8,17 @@
 """
 import json
 import os
-import sys
+import traceback
 from typing import Dict, Any
 
 import requests
 
-from hengline.logger import debug, info, error, warning
+from hengline.logger import debug, info, error, warning, is_debug_enabled
 from hengline.task.task_callback import task_callback_handler
 from utils.config_utils import get_task_config
 from utils.log_utils import print_log_exception
 from hengline.workflow.workflow_comfyui import comfyui_api
-from hengline.workflow.workflow_status_checker import workflow_status_checker
-
-# 添加scripts目录到Python路径
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from hengline.workflow.workflow_status_checker import get_workflow_status_checker
 
 
 class ComfyUIRunner:
@@ -78,7 +75,7 @@ class ComfyUIRunner:
                 error("转换后的工作流为空")
                 return {"success": False, "message": "转换后的工作流为空"}
 
-            info(f"准备发送工作流到ComfyUI API. comfyui_workflow= {comfyui_workflow}")
+            info("准备发送工作流到ComfyUI API. comfyui_workflow= %s", comfyui_workflow)
             # 发送工作流到ComfyUI API
             prompt_data = {
                 "prompt": comfyui_workflow,
@@ -162,11 +159,12 @@ class ComfyUIRunner:
         except Exception as e:
             error(f"工作流运行失败: {str(e)}")
             # 添加堆栈跟踪以帮助调试
-            import traceback
-            debug(f"异常详情: {traceback.format_exc()}")
+            if is_debug_enabled():
+                debug("异常详情: %s", traceback.format_exc())
             return {"success": False, "message": f"工作流运行失败: {str(e)}"}
 
-    def async_run_workflow(self, workflow, output_name, on_complete=None, on_error=None, task_id=None):
+    def async_run_workflow(self, workflow, output_name, on_complete=None, on_error=None, task_id=None,
+                           check_server=True):
         """
         异步运行工作流
         
@@ -176,13 +174,14 @@ class ComfyUIRunner:
             on_complete: 工作流完成时的回调函数
             on_error: 工作流出错时的回调函数
             task_id: 可选的外部任务ID，如果不提供则内部生成
+            check_server: 是否检查ComfyUI服务器状态，调用方已检查过时可传False
         
         Returns:
             str: 任务ID
         """
         try:
             # 1. 检查ComfyUI服务器状态
-            if not comfyui_api.check_server_status():
+            if check_server and not comfyui_api.check_server_status():
                 error_msg = "ComfyUI服务器未运行"
                 error(error_msg)
                 if on_error:
@@ -200,7 +199,9 @@ class ComfyUIRunner:
                         on_error(task_id, error_msg)
                     return ""
 
-            # 3. 发送工作流到ComfyUI API
+            # 3. 发送工作流到ComfyUI API，使用状态检查器的client_id，执行结束消息会直接推送给检查器
+            if isinstance(workflow, dict) and "prompt" in workflow:
+                workflow["client_id"] = get_workflow_status_checker().client_id
             rssult = comfyui_api.execute_workflow(workflow)
             if rssult is None or not rssult.get("success", False):
                 error_msg = f"{rssult.get('message', '未知错误') if rssult else '无响应'}"
@@ -221,7 +222,7 @@ class ComfyUIRunner:
                 on_complete(task_id, prompt_id)  # 初始调用，表示已提交
 
             # 6. 异步检查工作流状态 asyncio.run(
-            workflow_status_checker.check_workflow_status_async(
+            get_workflow_status_checker().check_workflow_status_async(
                 api_url=self.api_url,
                 output_name=output_name,
                 # on_complete=weakref.WeakMethod(task_callback_handler.handle_workflow_completion),
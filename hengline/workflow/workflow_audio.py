@@ -6,13 +6,8 @@
 @Author: HengLine
 @Time: 2025/08 - 2025/11
 """
-import os
-import sys
 from typing import Dict, Any, Coroutine
 
-# 添加项目根目录到Python路径
-sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
-
 # 导入需要的模块
 from hengline.logger import info
 from hengline.workflow.workflow_manage import WorkflowManager
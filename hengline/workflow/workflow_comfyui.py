@@ -7,6 +7,7 @@
 @Time: 2025/08 - 2025/11
 """
 
+import asyncio
 import json
 import os
 import threading
@@ -19,8 +20,7 @@ from hengline.logger import debug, error, warning, info
 from utils.config_utils import get_task_config, get_comfyui_api_url
 from utils.file_utils import is_valid_image_file
 from utils.log_utils import print_log_exception
-from hengline.workflow.workflow_node import fill_image_in_workflow
-from hengline.workflow.workflow_status_checker import workflow_status_checker
+from hengline.workflow.workflow_status_checker import get_workflow_status_checker
 
 
 class ComfyUIApi:
@@ -34,6 +34,9 @@ class ComfyUIApi:
             api_url: ComfyUI API URL地址，默认为http://127.0.0.1:8188
         """
         self.api_url = api_url
+        # 共享的HTTP会话，复用与ComfyUI服务器的连接；每个任务在各自的事件循环中执行，
+        # aiohttp会话无法跨事件循环复用，因此上传也使用该会话并放到线程中执行
+        self._session = requests.Session()
 
     def check_server_status(self) -> bool:
         """
@@ -43,7 +46,7 @@ class ComfyUIApi:
             bool: 服务器是否正常运行
         """
         try:
-            response = requests.get(f"{self.api_url}/system_stats", timeout=3)
+            response = self._session.get(f"{self.api_url}/system_stats", timeout=3)
             return response.status_code == 200
         except Exception as e:
             error(f"检查ComfyUI服务器状态失败: {str(e)}")
@@ -51,81 +54,52 @@ class ComfyUIApi:
 
     def _upload_image(self, image_path: str, subfolder: str = "haengline") -> Optional[str]:
         """
-        将图片上传到ComfyUI服务器
-        
+        将图片上传到ComfyUI服务器（同步版本，由async_upload_image放到线程中执行）
+
         Args:
             image_path: 本地图片路径
             subfolder: 上传到的子文件夹，默认为"haengline"
-        
+
         Returns:
             Optional[str]: 上传成功返回ComfyUI服务器上的文件名，失败返回None
         """
-        # 检查服务器是否正常运行
-        if not self.check_server_status():
-            error("ComfyUI服务器未运行，无法上传图片")
-            return None
-
-        # 检查图片文件是否存在
-        if not os.path.exists(image_path):
-            error(f"图片文件不存在: {image_path}")
-            return None
-
-        # 确保文件是有效的图片文件
+        # 确保文件是有效的图片文件；文件不存在时打开失败，在下方统一记录错误
         if not is_valid_image_file(image_path):
             error(f"无效的图片文件: {image_path}")
             return None
 
         try:
-            # 准备上传数据
-            files = {
-                'image': (os.path.basename(image_path), open(image_path, 'rb'))
-            }
-            data = {
-                'subfolder': subfolder
-            }
-
             debug(f"正在上传图片到ComfyUI服务器: {image_path}")
-            response = requests.post(f"{self.api_url}/upload/image", files=files, data=data, timeout=30)
+            with open(image_path, 'rb') as f:
+                files = {'image': (os.path.basename(image_path), f)}
+                response = self._session.post(f"{self.api_url}/upload/image", files=files,
+                                              data={'subfolder': subfolder}, timeout=30)
 
-            if response.status_code == 200 and response.ok:
+            if response.status_code == 200:
                 result = response.json()
                 filename = result.get('name')
                 filedir = result.get('subfolder')
                 debug(f"图片上传成功，ComfyUI文件名: {filename}, 子文件夹: {filedir}")
                 return os.path.join(filedir, filename)
-            else:
-                error(f"图片上传请求失败，状态码: {response.status_code}, 响应: {response.text}")
+            error(f"图片上传请求失败，状态码: {response.status_code}, 响应: {response.text}")
         except Exception as e:
             error(f"图片上传过程中发生错误: {str(e)}")
             print_log_exception()
-        finally:
-            # 确保文件被关闭
-            if 'files' in locals() and 'image' in files:
-                files['image'][1].close()
 
         return None
 
-    def upload_and_fill_image(self, image_path: str, workflow: Dict[str, Any], subfolder: str = "haengline",
-                              node_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    async def async_upload_image(self, image_path: str, subfolder: str = "haengline") -> Optional[str]:
         """
-        上传图片并将文件名填充到工作流中的图片节点
-        
+        异步上传图片到ComfyUI服务器，在线程中执行上传，可与工作流准备并发执行
+
         Args:
             image_path: 本地图片路径
-            workflow: 工作流数据
-            subfolder: 上传到的子文件夹，默认为"input"
-            node_id: 要填充的节点ID，如果为None则自动查找LoadImage节点
-        
+            subfolder: 上传到的子文件夹，默认为"haengline"
+
         Returns:
-            Optional[Dict[str, Any]]: 更新后的工作流数据，失败返回None
+            Optional[str]: 上传成功返回ComfyUI服务器上的文件名，失败返回None
         """
-        # 上传图片
-        image_filename = self._upload_image(image_path, subfolder)
-        if not image_filename:
-            return None
-
-        # 填充图片文件名到工作流
-        return fill_image_in_workflow(workflow, image_filename, node_id)
+        return await asyncio.to_thread(self._upload_image, image_path, subfolder)
 
     def execute_workflow(self, workflow: Dict[str, Any]) -> dict[str, Any]:
         """
@@ -139,7 +113,7 @@ class ComfyUIApi:
         """
         try:
             debug("正在提交工作流到ComfyUI服务器...")
-            response = requests.post(f"{self.api_url}/prompt", json=workflow, timeout=20)
+            response = self._session.post(f"{self.api_url}/prompt", json=workflow, timeout=20)
 
             if response.status_code == 200 and response.ok:
                 result = response.json()
@@ -182,7 +156,7 @@ class ComfyUIApi:
 
         if not completion_event.is_set():
             # 超时，取消检查
-            workflow_status_checker.cancel_check(task_id)
+            get_workflow_status_checker().cancel_check(task_id)
             error(f"等待工作流完成超时，已等待{max_wait_time}秒")
             return False
 
@@ -213,7 +187,7 @@ class ComfyUIApi:
             on_timeout = default_on_timeout
 
         # 调用工作流状态检查器
-        task_id = workflow_status_checker.check_workflow_status_async(
+        task_id = get_workflow_status_checker().check_workflow_status_async(
             prompt_id=prompt_id,
             output_name=output_filename,
             api_url=self.api_url,
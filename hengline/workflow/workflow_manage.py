@@ -6,10 +6,13 @@
 @Author: HengLine
 @Time: 2025/08 - 2025/11
 """
+import asyncio
 import os
 import random
-from typing import Dict, Any
+import time
+from typing import Dict, Any, Optional, Tuple
 
+from hengline.core.error_code import ErrorCode
 from hengline.logger import info, error, debug, warning
 from hengline.task.task_manage import task_queue_manager
 from hengline.task.task_queue import TaskStatus
@@ -20,7 +23,30 @@ from utils.file_utils import generate_output_filename
 from utils.log_utils import print_log_exception
 from hengline.workflow.run_workflow import ComfyUIRunner
 from hengline.workflow.workflow_comfyui import comfyui_api
-from hengline.workflow.workflow_node import load_workflow, update_workflow_params, wrap_workflow_for_comfyui
+from hengline.workflow.workflow_node import load_workflow, update_workflow_params, wrap_workflow_for_comfyui, \
+    fill_image_in_workflow
+
+# 最近一次任务成功提交后，在该时间窗口（秒）内跳过ComfyUI服务器健康检查
+SERVER_CHECK_SKIP_SECONDS = 30
+
+# 必须提供输入图片的任务类型
+IMAGE_INPUT_TASK_TYPES = ('image_to_image', 'image_to_video', 'change_clothes', 'change_hair_style', 'change_face')
+
+
+def _error_result(error_code: ErrorCode, *args) -> Dict[str, Any]:
+    """
+    记录错误日志并构造统一的失败结果
+
+    Args:
+        error_code: 错误码
+        *args: 用于填充错误信息中占位符的参数
+
+    Returns:
+        Dict[str, Any]: 失败结果
+    """
+    message = error_code.message.format(*args) if args else error_code.message
+    error(message)
+    return {"success": False, "message": message}
 
 
 class WorkflowManager:
@@ -30,43 +56,120 @@ class WorkflowManager:
         """初始化工作流管理器"""
         # 不再依赖传入的config参数，统一使用config_utils
         self.runner = runner
+        # 运行器是否已就绪，避免每次调用都重复判断runner与output_dir
+        self._runner_ready = runner is not None
         # 导入全局的workflow_presets变量
         self.workflow_presets = load_workflow_presets()
         self.output_dir = get_output_folder()
+        # 最近一次成功提交工作流的时间（monotonic），用于跳过冗余的服务器检查
+        self._last_success_ts = float('-inf')
+        # 任务类型 -> 已解析的工作流文件路径，预设在初始化时已加载，路径解析和文件存在检查每种类型只做一次
+        self._workflow_paths: Dict[str, str] = {}
 
     def init_runner(self):
         """初始化工作流运行器"""
+        if self._runner_ready:
+            return True
         if not self.runner and self.output_dir:
             # 使用配置工具获取API URL
             api_url = get_comfyui_api_url()
             self.runner = ComfyUIRunner(self.output_dir, api_url)
-        return self.runner is not None
+        self._runner_ready = self.runner is not None
+        return self._runner_ready
 
     def stop_runner(self):
         """停止工作流运行器"""
         if self.runner:
             # 这里不直接停止服务器，而是由app_flask.py中的全局变量处理
             self.runner = None
+        self._runner_ready = False
+
+    def _prepare_workflow(self, task_type: str) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        解析工作流文件路径，加载并包装工作流
+        返回的工作流是本次任务私有的副本，调用方可以直接原地修改
+
+        Args:
+            task_type: 任务类型
+
+        Returns:
+            Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]: (包装后的工作流, 失败结果)，失败时工作流为None
+        """
+        # 获取工作流文件路径（优先使用已缓存的解析结果）
+        # 缓存的文件已被删除或移动时重新解析，预设文件缺失时会回退到默认工作流
+        workflow_path = self._workflow_paths.get(task_type)
+        if workflow_path and not os.path.exists(workflow_path):
+            warning(f"已缓存的工作流文件不存在，重新解析: {workflow_path}")
+            self._workflow_paths.pop(task_type, None)
+            workflow_path = None
+        if not workflow_path:
+            workflow_path = self._resolve_workflow_path(task_type)
+            if not workflow_path:
+                return None, _error_result(ErrorCode.WORKFLOW_NOT_FOUND, task_type)
+            self._workflow_paths[task_type] = workflow_path
+
+        # 加载工作流（load_workflow内部缓存解析结果，返回独立副本）
+        workflow = load_workflow(workflow_path)
+        if workflow is None:
+            return None, _error_result(ErrorCode.WORKFLOW_LOAD_FAILED)
+
+        # 包装工作流以符合ComfyUI API的要求格式
+        # 我们的包装方法已经能够智能处理各种格式的工作流
+        wrapped_workflow = wrap_workflow_for_comfyui(workflow)
+        debug("工作流已包装完成")
+        return wrapped_workflow, None
 
-    def _process_common(self, task_type, image_path, prompt: str, negative_prompt: str = "", **kwargs) -> Dict[str, Any]:
+    def _resolve_workflow_path(self, task_type: str) -> Optional[str]:
+        """
+        解析任务类型对应的工作流文件路径：优先使用预设中的workflow文件，不存在时回退到默认工作流
+
+        Args:
+            task_type: 任务类型
+
+        Returns:
+            Optional[str]: 工作流文件路径，未配置时返回None
+        """
+        # 先检查workflow_presets.json的workflow节点是否有值
+        workflow_filename = self.workflow_presets.get(task_type, {}).get('workflow')
+        workflow_path = None
+
+        # 如果workflow节点有值，尝试使用该工作流文件
+        if workflow_filename:
+            preset_workflow_path = os.path.join(get_workflows_dir(), 'preset', workflow_filename)
+            if os.path.exists(preset_workflow_path):
+                workflow_path = preset_workflow_path
+                debug(f"使用预设工作流文件: {workflow_path}")
+            else:
+                warning(f"预设工作流文件不存在: {preset_workflow_path}")
+
+        # 如果workflow节点没有值或文件不存在，使用默认工作流文件
+        if not workflow_path:
+            workflow_path = get_workflow_path(task_type)
+            debug(f"使用默认工作流文件: {workflow_path}")
+
+        return workflow_path
+
+    def _process_common(self, task_type, image_path, prompt: str, negative_prompt: str = "",
+                        image_validated: bool = False, **kwargs) -> Dict[str, Any]:
         """
         异步处理任务，将任务加入队列并立即返回
 
         Args:
             prompt: 提示词
             negative_prompt: 负面提示词
+            image_validated: 图片是否已由上传接口保存并校验，为True时执行时跳过文件存在性检查；
+                该标记只决定使用的执行回调，不写入任务参数
             **kwargs: 其他参数
 
         Returns:
             Dict[str, Any]: 任务提交结果
         """
-        # 获取最终的有效配置，遵循优先级：页面输入 > setting节点 > default节点
-        preset_config = get_effective_config(task_type, **kwargs)
-
-        task_params = preset_config.copy()
-        # 确保关键参数被正确设置
-        task_params['prompt'] = prompt
-        task_params['negative_prompt'] = negative_prompt
+        # 获取最终的有效配置，遵循优先级：页面输入 > setting节点 > default节点，并一次性写入关键参数
+        task_params = {
+            **get_effective_config(task_type, **kwargs),
+            'prompt': prompt,
+            'negative_prompt': negative_prompt,
+        }
         if image_path:
             task_params['image_path'] = image_path
 
@@ -80,7 +183,7 @@ class WorkflowManager:
             None,
             task_type,
             task_params,
-            self._execute_common
+            self._execute_validated if image_path and image_validated else self._execute_common
         )
 
         # 立即返回任务信息，不等待任务完成
@@ -93,77 +196,57 @@ class WorkflowManager:
             'waiting_time': waiting_str
         }
 
-    async def _execute_common(self, task_type, params: Dict[str, Any], task_id: str) -> Dict[str, Any]:
+    async def _execute_validated(self, task_type, params: Dict[str, Any], task_id: str) -> Dict[str, Any]:
+        """执行图片已由上传接口校验过的任务，跳过重复的文件存在性检查"""
+        return await self._execute_common(task_type, params, task_id, image_validated=True)
+
+    async def _execute_common(self, task_type, params: Dict[str, Any], task_id: str,
+                              image_validated: bool = False) -> Dict[str, Any]:
         """
         执行文本到图像的工作流（异步版本）
 
         Args:
             params: 工作流参数
             task_id: 从外部传入的任务ID
+            image_validated: 图片是否已由上传接口校验过
 
         Returns:
             Dict[str, Any]: 工作流执行结果
         """
         try:
             info(f"开始执行{task_type}（{task_id}）工作流...")
-            if not self.init_runner():
-                return {'success': False, 'message': '无法初始化工作流运行器'}
+            if not self._runner_ready and not self.init_runner():
+                return _error_result(ErrorCode.RUNNER_INIT_FAILED)
 
             # 确保ComfyUI服务器正在运行
-            # 使用异步版本的服务器检查方法
-            server_running = comfyui_api.check_server_status()
-            if not server_running:
-                error("无法连接到ComfyUI服务器，请确保服务器已启动")
-                # raise Exception("无法连接到ComfyUI服务器，请确保服务器已启动")
-                return {"success": False, "message": "无法连接到ComfyUI服务器，请确保服务器已启动"}
-
-            # 获取工作流文件路径
-            # 先检查workflow_presets.json的workflow节点是否有值
-            workflow_filename = self.workflow_presets.get(task_type, {}).get('workflow')
-            workflow_path = None
-
-            # 如果workflow节点有值，尝试使用该工作流文件
-            if workflow_filename:
-                preset_workflow_path = os.path.join(get_workflows_dir(), 'preset', workflow_filename)
-                if os.path.exists(preset_workflow_path):
-                    workflow_path = preset_workflow_path
-                    debug(f"使用预设工作流文件: {workflow_path}")
-                else:
-                    warning(f"预设工作流文件不存在: {preset_workflow_path}")
-            
-            # 如果workflow节点没有值或文件不存在，使用默认工作流文件
-            if not workflow_path:
-                workflow_path = get_workflow_path(task_type)
-                debug(f"使用默认工作流文件: {workflow_path}")
-                
-            if not workflow_path:
-                error(f"未找到{task_type}工作流文件")
-                return {"success": False, "message": f"未找到{task_type}工作流文件"}
-
-            # 加载工作流
-            workflow = load_workflow(workflow_path)
-            if workflow is None:
-                error("工作流加载失败")
-                return {"success": False, "message": "工作流加载失败"}
-
-            # 包装工作流以符合ComfyUI API的要求格式
-            # 我们的包装方法已经能够智能处理各种格式的工作流
-            wrapped_workflow = wrap_workflow_for_comfyui(workflow)
-            debug("工作流已包装完成")
-
-            # 上传图片到ComfyUI服务器并更新工作流
+            # 最近的任务刚成功提交过，说明服务器存活，直接跳过健康检查
+            if time.monotonic() - self._last_success_ts >= SERVER_CHECK_SKIP_SECONDS:
+                if not comfyui_api.check_server_status():
+                    return _error_result(ErrorCode.COMFYUI_UNAVAILABLE)
+            else:
+                debug("ComfyUI服务器近期可用，跳过服务器状态检查")
+
+            # 上传图片到ComfyUI服务器，同时在线程中准备工作流，两者并发执行
             image_path = params.get('image_path', '')
-            updated_workflow = wrapped_workflow
-            if image_path and os.path.exists(image_path):
-                # 使用comfyui_api上传图片并将文件名填充到工作流中
-                updated_workflow = comfyui_api.upload_and_fill_image(image_path, updated_workflow)
-                if not updated_workflow:
-                    error("图片上传失败，无法继续处理图生图任务")
-                    return {"success": False, "message": "图片上传失败"}
-            elif task_type in ['image_to_image', 'image_to_video', 'change_clothes', 'change_hair_style', 'change_face']:
+            # 来自上传接口的图片已校验过，跳过重复的文件存在性检查
+            if image_path and (image_validated or os.path.exists(image_path)):
+                (workflow, failure), image_filename = await asyncio.gather(
+                    asyncio.to_thread(self._prepare_workflow, task_type),
+                    comfyui_api.async_upload_image(image_path)
+                )
+                if workflow is None:
+                    return failure
+                if not image_filename:
+                    return _error_result(ErrorCode.IMAGE_UPLOAD_FAILED)
+                # 将上传后的文件名填充到工作流中（工作流是本任务私有的副本，直接原地修改）
+                fill_image_in_workflow(workflow, image_filename, copy=False)
+            elif task_type in IMAGE_INPUT_TASK_TYPES:
                 # 如果没有图片路径或图片文件不存在
-                error(f"无效的图片路径: {image_path}")
-                return {"success": False, "message": f"无效的图片路径: {image_path}"}
+                return _error_result(ErrorCode.INVALID_IMAGE_PATH, image_path)
+            else:
+                workflow, failure = self._prepare_workflow(task_type)
+                if workflow is None:
+                    return failure
 
             # 创建params的副本，并移除image_path参数以避免覆盖已设置的图片节点值
             params_without_image = params.copy()
@@ -171,11 +254,8 @@ class WorkflowManager:
                 del params_without_image['image_path']
                 debug("已从参数中移除image_path以避免覆盖已设置的图片节点值")
 
-            # 更新其他工作流参数
-            updated_workflow = update_workflow_params(updated_workflow, params_without_image)
-            if updated_workflow is None:
-                error("更新工作流参数失败")
-                return {"success": False, "message": "更新工作流参数失败"}
+            # 更新其他工作流参数，原地修改，避免同时持有工作流的多份副本
+            update_workflow_params(workflow, params_without_image, copy=False)
 
             # 生成唯一的输出文件名
             output_filename = generate_output_filename(task_type)
@@ -190,12 +270,15 @@ class WorkflowManager:
                 task_queue_manager.update_task_status(on_task_id, TaskStatus.FAILED, task_msg=error_message)
 
             prompt_id = self.runner.async_run_workflow(
-                updated_workflow,
+                workflow,
                 output_filename,
                 on_complete=on_completion,
                 on_error=on_error,
-                task_id=task_id
+                task_id=task_id,
+                check_server=False
             )
+            if prompt_id:
+                self._last_success_ts = time.monotonic()
 
             # 返回任务信息，而不是等待结果
             return {
@@ -207,10 +290,9 @@ class WorkflowManager:
             }
 
         except Exception as e:
-            error(f"执行{task_id}工作流时出错: {str(e)}")
             # 添加详细的异常信息
             print_log_exception()
-            return {"success": False, "message": f"执行{task_id}工作流时出错: {str(e)}"}
+            return _error_result(ErrorCode.WORKFLOW_EXECUTE_FAILED, task_id, str(e))
 
     async def execute_common(self, task_type, params: Dict[str, Any], task_id: str) -> Dict[str, Any]:
         """
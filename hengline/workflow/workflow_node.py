@@ -7,21 +7,81 @@
 @Time: 2025/08 - 2025/11
 """
 
+import functools
 import json
 import os
-import sys
-from typing import Dict, Any, Optional
+import uuid
+from types import MappingProxyType
+from typing import Dict, Any, Optional, Final, Mapping, Tuple
 
 from hengline.logger import debug, warning, info
 
-# 添加scripts目录到Python路径
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# 尝试导入orjson库，解析大型工作流JSON比标准库快数倍；未安装时回退到json
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def _fast_json_copy(obj: Any) -> Any:
+    """
+    深拷贝JSON结构的数据（仅包含dict/list和不可变的标量）
+
+    比copy.deepcopy快得多：不维护memo字典，也不走通用的对象拷贝协议，
+    str/int/float/bool/None等不可变叶子节点直接复用
+
+    Args:
+        obj: 要拷贝的数据
+
+    Returns:
+        Any: 拷贝后的数据
+    """
+    obj_type = type(obj)
+    if obj_type is dict:
+        return {key: _fast_json_copy(value) for key, value in obj.items()}
+    if obj_type is list:
+        return [_fast_json_copy(value) for value in obj]
+    return obj
 
 
 def load_workflow(workflow_path: str) -> Dict[str, Any]:
-    """加载工作流文件并转换节点属性格式"""
-    with open(workflow_path, 'r', encoding='utf-8') as f:
-        workflow = json.load(f)
+    """
+    加载工作流文件并转换节点属性格式
+
+    解析结果按(路径, 修改时间)缓存，文件修改后自动重新解析；
+    每次返回缓存模板的独立副本，调用方可以放心修改
+
+    Args:
+        workflow_path: 工作流文件路径
+
+    Returns:
+        Dict[str, Any]: 工作流数据
+    """
+    mtime = os.stat(workflow_path).st_mtime
+    return _fast_json_copy(_load_workflow_cached(workflow_path, mtime))
+
+
+@functools.lru_cache(maxsize=64)
+def _load_workflow_cached(workflow_path: str, mtime: float) -> Dict[str, Any]:
+    """
+    解析工作流文件，结果由lru_cache缓存，不可直接修改返回值
+
+    Args:
+        workflow_path: 工作流文件路径
+        mtime: 文件修改时间，仅作为缓存键的一部分
+
+    Returns:
+        Dict[str, Any]: 缓存的工作流模板
+    """
+    if HAS_ORJSON:
+        # orjson按UTF-8解析字节串，与JSON规范一致
+        with open(workflow_path, 'rb') as f:
+            workflow = orjson.loads(f.read())
+    else:
+        with open(workflow_path, 'r', encoding='utf-8') as f:
+            workflow = json.load(f)
+    debug(f"已解析并缓存工作流文件: {workflow_path}")
 
     # 处理不同格式的工作流文件
     # 格式1: 根对象包含nodes数组
@@ -40,46 +100,67 @@ def load_workflow(workflow_path: str) -> Dict[str, Any]:
     return workflow
 
 
-def update_workflow_params(workflow: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
-    """更新工作流参数"""
-    # 使用深拷贝来确保所有属性都被正确保留
-    import copy
-    updated_workflow = copy.deepcopy(workflow)
+def update_workflow_params(workflow: Dict[str, Any], params: Dict[str, Any], copy: bool = True) -> Dict[str, Any]:
+    """
+    更新工作流参数
+
+    Args:
+        workflow: 工作流数据
+        params: 要更新的参数
+        copy: 为True时在深拷贝上修改并返回副本；为False时直接修改并返回传入的workflow，
+              适用于调用方已持有私有副本的情况
 
-    # 标记是否已经处理了正向提示词
-    positive_prompt_processed = False
+    Returns:
+        Dict[str, Any]: 更新后的工作流数据
+    """
+    # 使用深拷贝来确保所有属性都被正确保留
+    if copy:
+        updated_workflow = _fast_json_copy(workflow)
+    else:
+        updated_workflow = workflow
 
     # 优先处理原始格式：直接在prompt节点下更新参数
     if "prompt" in updated_workflow:
-        for node_id, node_data in updated_workflow["prompt"].items():
-            if "inputs" in node_data:
-                update_node_inputs(node_data, params, positive_prompt_processed)
-                # 检查是否处理了正向提示词
-                if node_data.get("class_type") == "CLIPTextEncode" and "text" in node_data["inputs"]:
-                    if "prompt" in params and node_data["inputs"]["text"] == params["prompt"]:
-                        positive_prompt_processed = True
+        nodes = [node_data for node_data in updated_workflow["prompt"].values() if "inputs" in node_data]
 
     # 保持兼容性：继续支持nodes数组格式
     elif "nodes" in updated_workflow:
-        # 遍历工作流中的所有节点
+        nodes = []
         for node_data in updated_workflow["nodes"]:
             # 确保节点有class_type属性，如果没有则从type属性复制
             if "type" in node_data and "class_type" not in node_data:
                 node_data["class_type"] = node_data["type"]
-
             if "inputs" in node_data:
-                update_node_inputs(node_data, params, positive_prompt_processed)
-                # 检查是否处理了正向提示词
-                if node_data.get("class_type") == "CLIPTextEncode" and "text" in node_data["inputs"]:
-                    if "prompt" in params and node_data["inputs"]["text"] == params["prompt"]:
-                        positive_prompt_processed = True
-
-    info(f"工作流参数已更新: {params}")
+                nodes.append(node_data)
+    else:
+        nodes = []
+
+    # 提示词节点：第一个CLIPTextEncode为正向提示词，其余为反向提示词
+    # 直接使用原始提示词，确保完全保留所有空格、换行符和格式
+    clip_inputs = []
+    for node_data in nodes:
+        inputs = node_data["inputs"]
+        if "text" in inputs and node_data.get("class_type", node_data.get("type", "")) == "CLIPTextEncode":
+            clip_inputs.append(inputs)
+    negative_inputs = clip_inputs
+    if clip_inputs and "prompt" in params:
+        clip_inputs[0]["text"] = params["prompt"]
+        negative_inputs = clip_inputs[1:]
+    if "negative_prompt" in params:
+        negative_prompt = params["negative_prompt"]
+        for inputs in negative_inputs:
+            inputs["text"] = negative_prompt
+
+    # 其他参数
+    for node_data in nodes:
+        update_node_inputs(node_data, params)
+
+    info("工作流参数已更新: %s", params)
     return updated_workflow
 
 
-def fill_image_in_workflow(workflow: Dict[str, Any], image_filename: str, node_id: Optional[str] = None) -> \
-        Dict[str, Any]:
+def fill_image_in_workflow(workflow: Dict[str, Any], image_filename: str, node_id: Optional[str] = None,
+                           copy: bool = True) -> Dict[str, Any]:
     """
     将上传的图片文件名填充到工作流中的图片节点
 
@@ -87,13 +168,16 @@ def fill_image_in_workflow(workflow: Dict[str, Any], image_filename: str, node_i
         workflow: 工作流数据
         image_filename: ComfyUI服务器上的图片文件名
         node_id: 要填充的节点ID，如果为None则自动查找LoadImage节点
+        copy: 为True时在深拷贝上修改并返回副本；为False时直接修改并返回传入的workflow
 
     Returns:
         Dict[str, Any]: 更新后的工作流数据
     """
     # 使用深拷贝避免修改原始工作流
-    import copy
-    updated_workflow = copy.deepcopy(workflow)
+    if copy:
+        updated_workflow = _fast_json_copy(workflow)
+    else:
+        updated_workflow = workflow
 
     # 检查工作流格式并填充图片文件名
     if "prompt" in updated_workflow:
@@ -120,9 +204,12 @@ def fill_image_in_workflow(workflow: Dict[str, Any], image_filename: str, node_i
     elif "nodes" in updated_workflow:
         # 处理nodes数组格式
         if node_id:
-            # 指定节点ID
+            # 指定节点ID：nodes数组中的id通常是整数，预先算出可能的取值，避免逐个节点调用str()
+            match_ids = {node_id}
+            if node_id.isdigit():
+                match_ids.add(int(node_id))
             for node in updated_workflow["nodes"]:
-                if str(node.get("id")) == node_id:
+                if node.get("id") in match_ids:
                     if node.get("class_type") == "LoadImage" and "inputs" in node:
                         node["inputs"]["image"] = image_filename
                         debug(f"已填充图片文件名到节点 {node_id}")
@@ -143,32 +230,31 @@ def fill_image_in_workflow(workflow: Dict[str, Any], image_filename: str, node_i
     return updated_workflow
 
 
-def update_node_inputs(node_data: Dict[str, Any], params: Dict[str, Any],
-                       positive_prompt_processed: bool) -> None:
+# 由CLIPTextEncode节点单独处理的提示词参数
+_PROMPT_PARAM_NAMES = frozenset(("prompt", "negative_prompt"))
+
+# 参数别名表：节点类型 -> ((参数名, 节点输入名), ...)，仅对对应类型的节点生效
+_NODE_PARAM_ALIASES: Final[Mapping[str, Tuple[Tuple[str, str], ...]]] = MappingProxyType({
+    "LoadImage": (("image_path", "image"),),
+})
+
+
+def update_node_inputs(node_data: Dict[str, Any], params: Dict[str, Any]) -> None:
     """
-    更新节点的输入参数
+    更新节点的输入参数（提示词由update_workflow_params统一处理）
 
     Args:
         node_data: 节点数据
         params: 要更新的参数
-        positive_prompt_processed: 是否已经处理了正向提示词
     """
     class_type = node_data.get("class_type", node_data.get("type", ""))
+    # 没有widget参数的节点（如VAEDecode、Reroute）只有连接输入，无需更新
+    if class_type in _NO_PARAM_NODES:
+        return
     inputs = node_data["inputs"]
 
-    # 特殊处理提示词节点 (CLIPTextEncode)
-    if class_type == "CLIPTextEncode" and "text" in inputs:
-        # 处理正向提示词节点（通常是第一个CLIPTextEncode）
-        if not positive_prompt_processed and "prompt" in params:
-            # 直接使用原始提示词，确保完全保留所有空格、换行符和格式
-            inputs["text"] = params["prompt"]
-        # 处理反向提示词节点（通常是第二个CLIPTextEncode）
-        elif "negative_prompt" in params:
-            # 直接使用原始反向提示词，确保完全保留所有空格、换行符和格式
-            inputs["text"] = params["negative_prompt"]
-
     # 特殊处理图像到视频节点 (WanImageToVideo)
-    elif class_type == "WanImageToVideo":
+    if class_type == "WanImageToVideo":
         # 确保宽度、高度和批量大小参数能够正确更新
         if "width" in params:
             inputs["width"] = params["width"]
@@ -187,24 +273,15 @@ def update_node_inputs(node_data: Dict[str, Any], params: Dict[str, Any],
     #         if "megapixels" in inputs:
     #             inputs["megapixels"] = megapixels
 
-    # 对于其他节点类型，动态更新所有匹配的参数
-    for param_name, param_value in params.items():
-        # 跳过特殊处理过的参数
-        # if param_name in ["prompt", "negative_prompt", "width", "height", "batch_size"]:
-        if param_name in ["prompt", "negative_prompt"]:
-            continue
-
-        # 处理参数名称映射（如cfg和cfg_scale可能指向同一个属性）
-        if param_name == "denoise" and "denoise" in inputs:
-            inputs["denoise"] = param_value
-        elif param_name == "image_path" and "image" in inputs and class_type == "LoadImage":
-            inputs["image"] = param_value
-        # 直接更新节点输入中存在的参数
-        elif param_name in inputs:
-            inputs[param_name] = param_value
+    # 处理参数名称映射（如 image_path 对应 LoadImage 节点的 image 输入）
+    for param_name, input_name in _NODE_PARAM_ALIASES.get(class_type, ()):
+        if param_name in params and input_name in inputs:
+            inputs[input_name] = params[param_name]
 
+    # 对于其他节点类型，只更新参数与节点输入的交集，跳过特殊处理过的提示词参数
+    for param_name in (params.keys() & inputs.keys()) - _PROMPT_PARAM_NAMES:
+        inputs[param_name] = params[param_name]
 
-import uuid
 
 def wrap_workflow_for_comfyui(workflow_nodes: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -220,19 +297,22 @@ def wrap_workflow_for_comfyui(workflow_nodes: Dict[str, Any]) -> Dict[str, Any]:
     prompt_nodes = {}
     
     # 如果workflow_nodes已经包含client_id、prompt等完整结构，直接返回
-    if isinstance(workflow_nodes, dict) and "client_id" in workflow_nodes and "prompt" in workflow_nodes:
+    if type(workflow_nodes) is dict and "client_id" in workflow_nodes and "prompt" in workflow_nodes:
         debug("工作流已经是完整格式，无需转换")
         return workflow_nodes
     
     # 处理已经是正确prompt节点格式的工作流（如用户提供的示例格式）
-    if isinstance(workflow_nodes, dict):
+    if type(workflow_nodes) is dict:
         prompt_nodes = convert_comfyui_visual_to_executable(workflow_nodes)
 
     # 如果无法识别格式或转换后prompt_nodes为空，尝试使用原始工作流
-    if not prompt_nodes and isinstance(workflow_nodes, dict):
+    if not prompt_nodes and type(workflow_nodes) is dict:
         prompt_nodes = workflow_nodes
     
     # 构建完整的工作流结构
+    # extra_pnginfo.workflow 直接引用 workflow_nodes，不做拷贝：load_workflow 每次返回独立副本，
+    # 包装之后的参数更新（update_workflow_params / fill_image_in_workflow）只修改 "prompt" 下的节点。
+    # 当 prompt_nodes 回退为 workflow_nodes 本身时，两处指向同一对象，行为与此前的深拷贝一致
     wrapped_workflow = {
         "client_id": str(uuid.uuid4()),
         "prompt": prompt_nodes,
@@ -248,63 +328,67 @@ def wrap_workflow_for_comfyui(workflow_nodes: Dict[str, Any]) -> Dict[str, Any]:
 
 
 
-# 预定义常见节点的 widget 参数名（按 widgets_values 顺序）
-NODE_WIDGET_MAPPINGS = {
+# 预定义常见节点的 widget 参数名（按 widgets_values 顺序），只读映射，值为元组
+NODE_WIDGET_MAPPINGS: Final[Mapping[str, Tuple[str, ...]]] = MappingProxyType({
     # === 图像生成 ===
-    "KSampler": ["seed", "control_after_generate", "steps", "cfg", "sampler_name", "scheduler", "denoise"],
-    "KSamplerAdvanced": ["add_noise", "noise_seed", "control_after_generate", "steps", "cfg", "sampler_name", "scheduler", "start_at_step", "end_at_step",
-                         "return_with_leftover_noise", "model"],
-    "EmptyLatentImage": ["width", "height", "batch_size"],
-    "CLIPTextEncode": ["text"],
-    "CheckpointLoaderSimple": ["ckpt_name"],
-    "VAEDecode": [],
-    "VAEEncode": [],
-    "SaveImage": ["filename_prefix"],
-    "PreviewImage": [],
+    "KSampler": ("seed", "control_after_generate", "steps", "cfg", "sampler_name", "scheduler", "denoise"),
+    "KSamplerSelect": ("sampler_name",),
+    "KSamplerAdvanced": ("add_noise", "noise_seed", "control_after_generate", "steps", "cfg", "sampler_name", "scheduler", "start_at_step", "end_at_step",
+                         "return_with_leftover_noise"),
+    "EmptyLatentImage": ("width", "height", "batch_size"),
+    "CLIPTextEncode": ("text",),
+    "CheckpointLoaderSimple": ("ckpt_name",),
+    "VAEDecode": (),
+    "VAEEncode": (),
+    "SaveImage": ("filename_prefix",),
+    "PreviewImage": (),
 
     # === ControlNet ===
-    "ControlNetLoader": ["control_net_name"],
-    "ControlNetApply": ["strength"],
-    "ControlNetApplyAdvanced": ["strength", "start_percent", "end_percent"],
+    "ControlNetLoader": ("control_net_name",),
+    "ControlNetApply": ("strength",),
+    "ControlNetApplyAdvanced": ("strength", "start_percent", "end_percent"),
 
     # === IPAdapter ===
-    "IPAdapterModelLoader": ["ipadapter_file"],
-    "IPAdapterClipVisionLoader": ["clip_name"],
-    "IPAdapterApply": ["weight", "noise"],
-    "IPAdapterApplyEncoded": ["weight", "noise"],
-    "IPAdapterEncoder": ["weight", "noise"],
+    "IPAdapterModelLoader": ("ipadapter_file",),
+    "IPAdapterClipVisionLoader": ("clip_name",),
+    "IPAdapterApply": ("weight", "noise"),
+    "IPAdapterApplyEncoded": ("weight", "noise"),
+    "IPAdapterEncoder": ("weight", "noise"),
 
     # === AnimateDiff (视频) ===
-    "AnimateDiffLoaderV1": ["model_name", "beta_schedule", "motion_scale", "apply_v2_models_properly"],
-    "AnimateDiffUniformContextOptions": ["context_length", "context_stride", "context_overlap", "closed_loop"],
-    "AnimateDiffSampler": ["noise_type", "seed"],
+    "AnimateDiffLoaderV1": ("model_name", "beta_schedule", "motion_scale", "apply_v2_models_properly"),
+    "AnimateDiffUniformContextOptions": ("context_length", "context_stride", "context_overlap", "closed_loop"),
+    "AnimateDiffSampler": ("noise_type", "seed"),
 
     # === 音频 (ComfyUI-Audio) ===
-    "LoadAudio": ["audio_file"],
-    "SaveAudio": ["filename_prefix", "format"],
-    "AudioToMelSpectrogram": ["n_mels", "hop_length"],
+    "LoadAudio": ("audio_file",),
+    "SaveAudio": ("filename_prefix", "format"),
+    "AudioToMelSpectrogram": ("n_mels", "hop_length"),
 
     # === 视频 (ComfyUI-VideoHelperSuite) ===
-    "VHS_VideoCombine": ["frame_rate", "loop_count", "filename_prefix", "format", "pix_fmt", "quality"],
-    "VHS_LoadVideo": ["video"],
-    "VHS_LoadImages": ["directory", "image_load_cap", "skip_first_images", "select_every_nth"],
+    "VHS_VideoCombine": ("frame_rate", "loop_count", "filename_prefix", "format", "pix_fmt", "quality"),
+    "VHS_LoadVideo": ("video",),
+    "VHS_LoadImages": ("directory", "image_load_cap", "skip_first_images", "select_every_nth"),
 
     # === 3D / Mesh ===
-    "LoadMesh": ["mesh_file"],
-    "SaveMesh": ["filename_prefix"],
+    "LoadMesh": ("mesh_file",),
+    "SaveMesh": ("filename_prefix",),
 
     # === 其他常用 ===
-    "ImageScale": ["upscale_method", "width", "height", "crop"],
-    "ImageScaleBy": ["upscale_method", "scale_by"],
-    "LoraLoader": ["lora_name", "strength_model", "strength_clip"],
-    "VAELoader": ["vae_name"],
-    "CLIPLoader": ["clip_name"],
-    "ConditioningZeroOut": [],
-    "ConditioningSetArea": ["width", "height", "x", "y", "strength"],
-    "ConditioningSetMask": ["strength", "set_cond_area"],
-    "FreeU_V2": ["b1", "b2", "s1", "s2"],
-    "Reroute": [],  # 透传节点
-}
+    "ImageScale": ("upscale_method", "width", "height", "crop"),
+    "ImageScaleBy": ("upscale_method", "scale_by"),
+    "LoraLoader": ("lora_name", "strength_model", "strength_clip"),
+    "VAELoader": ("vae_name",),
+    "CLIPLoader": ("clip_name",),
+    "ConditioningZeroOut": (),
+    "ConditioningSetArea": ("width", "height", "x", "y", "strength"),
+    "ConditioningSetMask": ("strength", "set_cond_area"),
+    "FreeU_V2": ("b1", "b2", "s1", "s2"),
+    "Reroute": (),  # 透传节点
+})
+
+# 没有任何widget参数的节点类型，update_node_inputs直接跳过
+_NO_PARAM_NODES = frozenset(node_type for node_type, widget_names in NODE_WIDGET_MAPPINGS.items() if not widget_names)
 
 """根据节点类型转换"""
 def convert_comfyui_visual_to_executable(visual_workflow: Dict[str, Any]) -> Dict[str, Any]:
@@ -316,72 +400,41 @@ def convert_comfyui_visual_to_executable(visual_workflow: Dict[str, Any]) -> Dic
     links = visual_workflow.get("links", [])
 
     # 构建连接映射: (to_node_id, to_input_index) -> (from_node_id, from_output_index)
-    link_map = {}
-    for link in links:
-        # link = [link_id, from_node_id, from_output_idx, to_node_id, to_input_idx, type]
-        _, from_id, from_out_idx, to_id, to_in_idx, _ = link
-        link_map[(to_id, to_in_idx)] = (from_id, from_out_idx)
+    # link = [link_id, from_node_id, from_output_idx, to_node_id, to_input_idx, type]
+    link_map = {(link[3], link[4]): (link[1], link[2]) for link in links}
 
     executable = {}
 
     for node in nodes:
-        node_id = str(node["id"])
+        nid = node["id"]
+        node_id = str(nid)
         node_type = node["type"]
         widgets = node.get("widgets_values", [])
         inputs_list = node.get("inputs", [])
-        input_names = [inp["name"] for inp in inputs_list]
 
         inputs_dict = {}
-        # ==============================
-        # 特殊处理：KSampler 及其变体
-        # ==============================
-        if node_type in ["KSampler", "KSamplerSelect", "KSamplerAdvanced"]:
-            if node_type == "KSampler":
-                if len(widgets) >= 7:
-                    inputs_dict.update({
-                        "seed": widgets[0],
-                        "control_after_generate": widgets[1],  # ← 关键！不要丢
-                        "steps": widgets[2],
-                        "cfg": widgets[3],
-                        "sampler_name": widgets[4],
-                        "scheduler": widgets[5],
-                        "denoise": widgets[6]
-                    })
-                # 处理连接输入（model, positive, negative, latent_image）
-                for idx, inp in enumerate(inputs_list):
-                    if (node["id"], idx) in link_map:
-                        from_id, from_out = link_map[(node["id"], idx)]
-                        inputs_dict[inp["name"]] = [str(from_id), from_out]
-
-            elif node_type == "KSamplerAdvanced":
-                # 类似处理，参数更多
-                pass  # 可按需扩展
-
-        # ==============================
-        # 其他节点：通用逻辑
-        # ==============================
+        # KSampler 及其变体同样走通用逻辑，widget 顺序由 NODE_WIDGET_MAPPINGS 定义
+        # 1. 处理连接（单次 get 查询，避免 in + [] 两次哈希）
+        for idx, inp in enumerate(inputs_list):
+            link = link_map.get((nid, idx))
+            if link is not None:
+                from_id, from_out = link
+                inputs_dict[inp["name"]] = [str(from_id), from_out]
+
+        # 2. 处理 widgets（按 NODE_WIDGET_MAPPINGS）
+        widget_names = NODE_WIDGET_MAPPINGS.get(node_type)
+        if widget_names is not None:
+            # 将 widgets 按顺序映射到 widget_names，多余的一方被 zip 截断
+            inputs_dict.update(zip(widget_names, widgets))
         else:
-            # 1. 处理连接
-            for idx, inp in enumerate(inputs_list):
-                if (node["id"], idx) in link_map:
-                    from_id, from_out = link_map[(node["id"], idx)]
-                    inputs_dict[inp["name"]] = [str(from_id), from_out]
-
-            # 2. 处理 widgets（按 NODE_WIDGET_MAPPINGS）
-            if node_type in NODE_WIDGET_MAPPINGS:
-                widget_names = NODE_WIDGET_MAPPINGS[node_type]
-                # 将 widgets 按顺序映射到 widget_names
-                for i, name in enumerate(widget_names):
-                    if i < len(widgets):
-                        inputs_dict[name] = widgets[i]
-            else:
-                # 未知节点：保守处理
-                for i, w in enumerate(widgets):
-                    if i < len(inputs_list):
-                        if inputs_list[i]["name"] not in inputs_dict:
-                            inputs_dict[inputs_list[i]["name"]] = w
-                    else:
-                        inputs_dict[f"param_{i}"] = w
+            # 未知节点：保守处理
+            for i, w in enumerate(widgets):
+                if i < len(inputs_list):
+                    inp_name = inputs_list[i]["name"]
+                    if inp_name not in inputs_dict:
+                        inputs_dict[inp_name] = w
+                else:
+                    inputs_dict[f"param_{i}"] = w
 
         executable[node_id] = {
             "class_type": node_type,
@@ -6,33 +6,143 @@
 @Author: HengLine
 @Time: 2025/08 - 2025/11
 """
+import asyncio
 import functools
+from concurrent.futures import ThreadPoolExecutor
+import json
+import queue
+import random
 import threading
 import time
-import weakref
-from typing import Callable
+import uuid
+from dataclasses import dataclass
+from typing import Callable, Dict, Set, Optional
 
+import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from hengline.logger import debug, error, warning
+# 尝试导入orjson库，解析 /history 响应和 /ws 推送消息比标准库快数倍；未安装时回退到标准库json
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+from hengline.logger import debug, error
 from utils.config_utils import get_task_config
 from utils.log_utils import print_log_exception
 
+# 批量查询 /history 时至少取回的最近记录条数，避免无参数时返回ComfyUI保存的全部历史
+HISTORY_BATCH_MIN_ITEMS = 64
+
+# ComfyUI /ws 推送中表示队列或执行状态发生变化的消息类型，收到后立即触发一次检查
+# （executing 等消息只发给提交任务时指定的 client_id，status 消息则广播给所有连接）
+WS_WAKEUP_MESSAGE_TYPES = frozenset({'status', 'executing', 'executed', 'execution_success', 'execution_error',
+                                     'execution_interrupted'})
+# 表示某个prompt已执行结束的消息类型（executing 且 node 为 None 时也表示结束）
+WS_PROMPT_DONE_MESSAGE_TYPES = frozenset({'execution_success', 'execution_error', 'execution_interrupted'})
+
+# 工作流输出中的文件类型键及其中文名称，按顺序匹配，都不匹配时按文本统计
+OUTPUT_KINDS = (('images', '图像文件'), ('video', '视频文件'), ('audio', '音频文件'))
+
+
+def _load_json(response: requests.Response):
+    """解析响应体中的JSON，优先使用orjson"""
+    return orjson.loads(response.content) if HAS_ORJSON else response.json()
+
+
+def _loads_json(text: str):
+    """解析 /ws 推送消息中的JSON文本，优先使用orjson"""
+    return orjson.loads(text) if HAS_ORJSON else json.loads(text)
+
 # 导入SocketIO路由模块，用于实时推送任务状态
 from hengline.flask.route.socketio_route import emit_task_status_update
 
 
+@dataclass
+class TaskInfo:
+    """单个工作流状态检查任务的信息，检查时直接读取属性，不再复制字典"""
+    prompt_id: str
+    api_url: str
+    history_url: str  # 预先拼接好的 {api_url}/history/{prompt_id}
+    start_time: float  # time.monotonic()，只用于计算已等待时间
+    check_interval: float
+    output_name: str
+    timeout_seconds: int
+    on_complete: Callable
+    on_timeout: Callable
+    max_consecutive_failures: int
+    status_task_id: str  # 推送任务状态更新时使用的任务ID：外部传入的task_id，未传入时为prompt_id
+    consecutive_failures: int = 0
+
+
 class WorkflowStatusChecker:
-    """异步定时任务队列，用于检查工作流执行状态"""
+    """异步定时任务队列，用于检查工作流执行状态
+
+    所有定时检查都以协程形式调度在同一个后台事件循环上（asyncio.sleep 代替每次检查新建的 threading.Timer 线程），
+    阻塞的HTTP请求和回调在有界线程池中执行，不会卡住事件循环，也限制了同时发往ComfyUI的请求数。
+    同一个ComfyUI地址下的任务由一个轮询协程统一检查，每轮只请求一次 /history。
+    同时订阅该地址的 /ws 推送：队列有任务结束时立即检查，推送连接正常时轮询只作为兜底（按最大间隔进行）。
+    checking_tasks 的复合读写都发生在事件循环线程上，其他线程只做单次的字典读写/删除（在CPython中是原子的），因此不再需要锁。
+    """
 
     def __init__(self):
         """初始化工作流状态检查器"""
-        self.checking_tasks = {}
-        self.checking_tasks_lock = threading.Lock()
+        self.checking_tasks: Dict[str, TaskInfo] = {}
         self.default_check_interval = 10  # 默认检查间隔（秒）
         self.max_check_interval = 30  # 最大检查间隔（秒）
-        self.task_timeout_seconds = get_task_config().get('task_timeout_seconds', 1800)  # 默认超时时间
-        self.max_consecutive_failures = get_task_config().get('task_max_retry', 5)  # 连续失败次数上限
+        self._backoff = 1.5  # 每次未完成时检查间隔的增长倍数
+        task_config = get_task_config()
+        self.task_timeout_seconds = task_config.get('task_timeout_seconds', 1800)  # 默认超时时间
+        self.max_consecutive_failures = task_config.get('task_max_retry', 5)  # 连续失败次数上限
+
+        # 共享的HTTP会话，复用到ComfyUI的keep-alive连接，避免每次轮询都重新握手；
+        # 短暂的连接失败和网关错误由urllib3在连接池内重试，只有重试耗尽才计入consecutive_failures
+        self._session = requests.Session()
+        retry = Retry(total=3, connect=3, backoff_factor=0.5, status_forcelist=(502, 503, 504),
+                      allowed_methods=frozenset(['GET']), raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=64, max_retries=retry)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+
+        # 执行阻塞HTTP请求和回调的有界线程池，线程在多次检查间复用
+        self._io_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="wf-check")
+
+        # 后台事件循环线程，负责调度所有任务的定时检查
+        self._loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._loop.run_forever, name="wf-status-loop", daemon=True)
+        self._loop_thread.start()
+        # api_url -> 该地址下正在检查的任务ID集合，以及对应的轮询协程（同时防止其被垃圾回收）
+        self._hosts: Dict[str, Set[str]] = {}
+        self._host_pollers: Dict[str, asyncio.Task] = {}
+        # api_url -> 唤醒轮询协程的事件、/ws 监听协程；以及推送连接正常的地址集合
+        self._host_wakeups: Dict[str, asyncio.Event] = {}
+        self._host_listeners: Dict[str, asyncio.Task] = {}
+        self._ws_connected: Set[str] = set()
+        self._prompt_checks: Set[asyncio.Task] = set()
+        # 提交工作流时使用该client_id，ComfyUI会把对应prompt的执行消息直接推送到检查器的 /ws 连接
+        self.client_id = str(uuid.uuid4())
+
+        # 任务状态推送队列：完成回调只负责入队，由单独的后台线程调用 emit_task_status_update，
+        # 避免SocketIO广播阻塞检查线程池
+        self._emit_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._emit_thread = threading.Thread(target=self._emit_worker, name="wf-status-emit", daemon=True)
+        self._emit_thread.start()
+
+    def _emit_worker(self):
+        """后台推送线程：依次取出队列中的任务状态并通过WebSocket推送，收到None时退出"""
+        while True:
+            item = self._emit_queue.get()
+            if item is None:
+                break
+            task_id, status_data = item
+            try:
+                emit_task_status_update(task_id, status_data)
+                debug("通过WebSocket推送工作流状态更新: %s, 状态: %s", task_id, status_data['status'])
+            except Exception as e:
+                error(f"推送工作流状态更新失败: {str(e)}")
 
     def check_workflow_status_async(self, prompt_id: str, api_url: str, output_name: str,
                                     on_complete: Callable[[str, bool], None],
@@ -55,9 +165,11 @@ class WorkflowStatusChecker:
         Returns:
             str: 任务ID，用于后续操作
         """
-        # 如果没有提供task_id，则在内部生成
+        # 如果没有提供task_id，则在内部生成，状态推送时使用prompt_id作为任务标识
+        status_task_id = task_id
         if task_id is None:
-            task_id = f"check_{prompt_id}_{int(time.time())}"
+            task_id = f"check_{prompt_id}_{time.time_ns() // 1_000_000_000}"
+            status_task_id = prompt_id
         check_interval = check_interval if check_interval else self.default_check_interval
         timeout_seconds = timeout_seconds if timeout_seconds else self.task_timeout_seconds
         max_consecutive_failures = self.max_consecutive_failures
@@ -66,307 +178,390 @@ class WorkflowStatusChecker:
         check_interval = max(1, min(check_interval, self.max_check_interval))
 
         # 记录任务信息
-        task_info = {
-            'prompt_id': prompt_id,
-            'api_url': api_url,
-            'start_time': time.time(),
-            'check_interval': check_interval,
-            'output_name': output_name,
-            'timeout_seconds': timeout_seconds,
-            'on_complete': on_complete,
-            'on_timeout': on_timeout,
-            'consecutive_failures': 0,
-            'max_consecutive_failures': max_consecutive_failures
-        }
-
-        with self.checking_tasks_lock:
-            self.checking_tasks[task_id] = task_info
-
-        # 启动异步检查
-        self._schedule_check(task_id)
+        task_info = TaskInfo(
+            prompt_id=prompt_id,
+            api_url=api_url,
+            history_url=f"{api_url}/history/{prompt_id}",
+            start_time=time.monotonic(),
+            check_interval=check_interval,
+            output_name=output_name,
+            timeout_seconds=timeout_seconds,
+            on_complete=on_complete,
+            on_timeout=on_timeout,
+            max_consecutive_failures=max_consecutive_failures,
+            status_task_id=status_task_id
+        )
+
+        self.checking_tasks[task_id] = task_info
+
+        # 启动异步检查（调用方通常不在事件循环线程上）
+        self._loop.call_soon_threadsafe(self._schedule_check, task_id, api_url)
 
         debug(f"已启动异步工作流状态检查，任务ID: {task_id}, prompt_id: {prompt_id}")
         return task_id
 
-    def _schedule_check(self, task_id: str):
-        """安排下一次检查"""
-        with self.checking_tasks_lock:
-            if task_id not in self.checking_tasks:
-                return
-
-            task_info = self.checking_tasks[task_id]
-            check_interval = task_info['check_interval']
+    def _schedule_check(self, task_id: str, api_url: str):
+        """将任务加入所属ComfyUI地址的轮询，只能在事件循环线程上调用"""
+        if task_id not in self.checking_tasks:
+            return
 
-        # 创建定时器，在指定间隔后执行检查
-        timer = threading.Timer(check_interval, self._check_workflow_status, args=[task_id])
-        timer.daemon = True
-        timer.start()
+        self._hosts.setdefault(api_url, set()).add(task_id)
+        if api_url not in self._host_pollers:
+            self._host_wakeups[api_url] = asyncio.Event()
+            self._host_pollers[api_url] = self._loop.create_task(self._poll_host(api_url))
+            self._host_listeners[api_url] = self._loop.create_task(self._listen_host(api_url))
 
-    def _check_workflow_status(self, task_id: str):
-        """检查工作流状态的核心方法"""
-        with self.checking_tasks_lock:
-            if task_id not in self.checking_tasks:
-                debug(f"任务ID {task_id} 不在检查任务列表中，跳过检查")
-                return
-
-            task_info = self.checking_tasks[task_id].copy()
+    async def _poll_host(self, api_url: str):
+        """按该地址下任务的最小检查间隔循环检查（或被 /ws 推送提前唤醒），直到没有任务为止"""
+        task_ids = self._hosts[api_url]
+        wakeup = self._host_wakeups[api_url]
+        try:
+            while True:
+                # 剔除已完成、超时或被取消的任务
+                task_ids.intersection_update(self.checking_tasks.keys())
+                if not task_ids:
+                    return
 
-        prompt_id = task_info['prompt_id']
-        api_url = task_info['api_url']
-        start_time = task_info['start_time']
-        output_name = task_info['output_name']
-        timeout_seconds = task_info['timeout_seconds']
-        on_complete = task_info['on_complete']
-        on_timeout = task_info['on_timeout']
-        consecutive_failures = task_info['consecutive_failures']
-        max_consecutive_failures = task_info['max_consecutive_failures']
+                if api_url in self._ws_connected:
+                    interval = self.max_check_interval
+                else:
+                    # 任务可能同时被其他线程取消，用get读取并跳过已移除的任务
+                    interval = min((task_info.check_interval for task_info in map(self.checking_tasks.get, task_ids)
+                                    if task_info is not None), default=self.max_check_interval)
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=interval)
+                except asyncio.TimeoutError:
+                    pass
+                wakeup.clear()
+
+                try:
+                    await self._check_host(api_url)
+                except Exception as e:
+                    error(f"检查工作流状态时出现未处理的异常: {str(e)}")
+                    print_log_exception()
+        finally:
+            self._hosts.pop(api_url, None)
+            self._host_pollers.pop(api_url, None)
+            self._host_wakeups.pop(api_url, None)
+            listener = self._host_listeners.pop(api_url, None)
+            if listener is not None:
+                listener.cancel()
+
+    async def _listen_host(self, api_url: str):
+        """
+        订阅ComfyUI的 /ws 推送；断线后按最大检查间隔重连
 
-        # 检查是否超时
-        elapsed_time = time.time() - start_time
-        if elapsed_time > timeout_seconds:
-            debug(f"工作流状态检查超时，任务ID: {task_id}, prompt_id: {prompt_id}")
+        以本检查器client_id提交的prompt执行结束时，立即单独查询该prompt；
+        其他客户端提交的任务只能从广播的status消息得知队列减少，此时唤醒该地址的轮询协程
+        """
+        ws_url = f"ws{api_url[4:]}/ws?clientId={self.client_id}" if api_url.startswith('http') else None
+        if ws_url is None:
+            return
 
-            # 执行超时回调
-            try:
-                callback_with_args = functools.partial(
-                    on_timeout,
-                    task_id,
-                    prompt_id
-                )
-
-                weak_callback = weakref.ref(callback_with_args)
-                # 调用弱引用回调
-                if weak_callback() is not None:
-                    weak_callback()()
-                else:
-                    warning("weak_callback(on_timeout) 对象已被垃圾回收")
+        try:
+            while api_url in self._host_pollers:
+                try:
+                    async with aiohttp.ClientSession() as session:
+                        async with session.ws_connect(ws_url, heartbeat=30) as ws:
+                            self._ws_connected.add(api_url)
+                            debug(f"已连接ComfyUI推送: {ws_url}")
+                            queue_remaining = None
+                            async for msg in ws:
+                                if msg.type != aiohttp.WSMsgType.TEXT:
+                                    continue
+                                data = _loads_json(msg.data)
+                                msg_type = data.get('type')
+                                if msg_type not in WS_WAKEUP_MESSAGE_TYPES:
+                                    continue
+                                msg_data = data.get('data') or {}
+                                if msg_type in WS_PROMPT_DONE_MESSAGE_TYPES or (msg_type == 'executing' and msg_data.get('node') is None):
+                                    if self._check_prompt_now(api_url, msg_data.get('prompt_id')):
+                                        continue
+                                elif msg_type == 'executing':
+                                    continue
+                                if msg_type == 'status':
+                                    # 只有队列剩余数量减少（有任务结束）时才需要检查
+                                    remaining = data.get('data', {}).get('status', {}).get('exec_info', {}).get('queue_remaining')
+                                    decreased = queue_remaining is not None and remaining is not None and remaining < queue_remaining
+                                    queue_remaining = remaining
+                                    if not decreased:
+                                        continue
+                                wakeup = self._host_wakeups.get(api_url)
+                                if wakeup is not None:
+                                    wakeup.set()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    debug(f"ComfyUI推送连接不可用，使用轮询检查: {str(e)}")
+                finally:
+                    self._ws_connected.discard(api_url)
+
+                await asyncio.sleep(self.max_check_interval)
+        except asyncio.CancelledError:
+            pass
+
+    def _check_prompt_now(self, api_url: str, prompt_id: Optional[str]) -> bool:
+        """
+        立即单独检查该地址下指定prompt对应的任务
 
-            except Exception as e:
-                error(f"执行超时回调时出错: {str(e)}")
-                print_log_exception()
+        Returns:
+            bool: 是否找到了对应的检查任务
+        """
+        task_id = next((task_id for task_id in self._hosts.get(api_url, ())
+                        if task_id in self.checking_tasks and self.checking_tasks[task_id].prompt_id == prompt_id), None)
+        if task_id is None:
+            return False
 
-            # 移除任务
-            with self.checking_tasks_lock:
-                self.checking_tasks.pop(task_id, None)
+        future = self._loop.create_task(self._check_workflow_status(task_id))
+        self._prompt_checks.add(future)
+        future.add_done_callback(self._prompt_checks.discard)
+        return True
 
+    async def _check_host(self, api_url: str):
+        """一次请求 /history 获取该地址下所有任务的状态，再逐个分发处理"""
+        task_ids = [task_id for task_id in self._hosts.get(api_url, ()) if task_id in self.checking_tasks]
+        if not task_ids:
             return
 
+        max_items = max(HISTORY_BATCH_MIN_ITEMS, len(task_ids) * 2)
+        history = None
         try:
-            # 发送请求检查工作流状态
-            response = requests.get(f"{api_url}/history/{prompt_id}", timeout=10)  # 增加超时时间到10秒
+            response = await self._run_blocking(self._session.get, f"{api_url}/history",
+                                                params={'max_items': max_items}, timeout=10)
             if response.status_code == 200:
-                history = response.json()
-
-                # 确保history是字典类型
-                if not isinstance(history, dict):
-                    debug(f"历史记录不是字典类型，而是: {type(history)}")
-                    # 增加检查间隔但继续检查
-                    with self.checking_tasks_lock:
-                        if task_id in self.checking_tasks:
-                            self.checking_tasks[task_id]['check_interval'] = min(
-                                self.checking_tasks[task_id]['check_interval'] * 1.5, self.max_check_interval
-                            )
-
-                    self._schedule_check(task_id)
-                    return
+                history = _load_json(response)
+        except Exception as e:
+            debug(f"批量获取历史记录失败，改为逐个查询: {str(e)}")
 
-                if prompt_id in history:
-                    prompt_data = history[prompt_id]
-
-                    # 确保prompt_data是字典类型
-                    if not isinstance(prompt_data, dict):
-                        debug(f"prompt_data不是字典类型，而是: {type(prompt_data)}")
-                        # 增加检查间隔但继续检查
-                        with self.checking_tasks_lock:
-                            if task_id in self.checking_tasks:
-                                self.checking_tasks[task_id]['check_interval'] = min(
-                                    self.checking_tasks[task_id]['check_interval'] * 1.5, self.max_check_interval
-                                )
-
-                        self._schedule_check(task_id)
-                        return
-
-                    # 检查工作流是否完成
-                    if "outputs" in prompt_data:
-                        # {'9': {'images': [{'filename': 'ComfyUI_00055_.png', 'subfolder': '', 'type': 'output'}]}}
-                        debug(f"工作流处理完成，任务ID: {task_id}, prompt_id: {prompt_id}, 输出: {prompt_data['outputs']}")
-
-                        file_num = 0
-                        file_name = '图像文件'
-                        for value in prompt_data['outputs'].values():
-                            if 'images' in value:
-                                images_list = value.get('images', [])
-                                file_num += len(images_list)
-                                file_name = '图像文件'
-                            elif 'video' in value:
-                                videos_list = value.get('video', [])
-                                file_num += len(videos_list)
-                                file_name = '视频文件'
-                            elif 'audio' in value:
-                                audios_list = value.get('audio', [])
-                                file_num += len(audios_list)
-                                file_name = '音频文件'
-                            else:
-                                files_list = value.get('text', [])
-                                file_num += len(files_list)
-                                file_name = '文本'
-
-                        # 执行完成回调，标记为成功
-                        msg = f"共生成 {file_num} 个 {file_name} "
-                        self.callback_with_complete(task_id, prompt_id, True, output_name, msg, on_complete)
-
-                        return
-                    elif "error" in prompt_data:
-                        # 工作流执行出错
-                        debug(f"工作流执行出错，任务ID: {task_id}, prompt_id: {prompt_id}, 错误: {prompt_data['error']}")
-
-                        # 执行完成回调，标记为失败
-                        self.callback_with_complete(task_id, prompt_id, False, output_name
-                                                    , f"工作流执行出错，任务ID: {task_id}, 错误: {prompt_data['error']}", on_complete)
-                        return
-                    else:
-                        # 工作流仍在执行中，增加检查间隔但继续检查
-                        with self.checking_tasks_lock:
-                            if task_id in self.checking_tasks:
-                                self.checking_tasks[task_id]['check_interval'] = min(
-                                    self.checking_tasks[task_id]['check_interval'] * 1.5, self.max_check_interval
-                                )
-
-                        self._schedule_check(task_id)
-                        return
-                else:
-                    # prompt_id不在历史记录中，可能仍在处理中
-                    debug(f"prompt_id {prompt_id} 不在历史记录中，可能仍在处理中")
+        # 返回条数达到上限时，较早完成的任务可能被截掉，此时回退到逐个查询
+        if not isinstance(history, dict) or len(history) >= max_items:
+            history = None
 
-                    # 增加检查间隔但继续检查
-                    with self.checking_tasks_lock:
-                        if task_id in self.checking_tasks:
-                            self.checking_tasks[task_id]['check_interval'] = min(
-                                self.checking_tasks[task_id]['check_interval'] * 1.5, self.max_check_interval
-                            )
+        # 有任务不在历史记录中时，再查一次 /queue 区分"排队/执行中"和"ComfyUI已不认识"（如服务重启后丢失）
+        queued = None
+        # 任务可能同时被其他线程取消，用get读取并跳过已移除的任务
+        if history is not None and any(task_info is not None and task_info.prompt_id not in history
+                                       for task_info in map(self.checking_tasks.get, task_ids)):
+            queued = await self._fetch_queued_prompt_ids(api_url)
 
-                    self._schedule_check(task_id)
-                    return
-            else:
-                # 非200响应码，记录错误但继续尝试
-                debug(f"获取历史记录失败，状态码: {response.status_code}, 任务ID: {task_id}, prompt_id: {prompt_id}")
+        await asyncio.gather(*(self._check_workflow_status(task_id, history, queued) for task_id in task_ids))
 
-                # 重置连续失败计数
-                with self.checking_tasks_lock:
-                    if task_id in self.checking_tasks:
-                        self.checking_tasks[task_id]['consecutive_failures'] = 0
+    async def _fetch_queued_prompt_ids(self, api_url: str) -> Optional[Set[str]]:
+        """
+        获取ComfyUI队列中正在执行和等待执行的prompt_id
 
-                # 继续检查
-                self._schedule_check(task_id)
-                return
+        Returns:
+            Optional[Set[str]]: prompt_id集合，获取失败时返回None
+        """
+        try:
+            response = await self._run_blocking(self._session.get, f"{api_url}/queue", timeout=10)
+            if response.status_code != 200:
+                return None
+            queue = _load_json(response)
+            # 队列项格式: [number, prompt_id, prompt, extra_data, outputs_to_execute]
+            return {item[1] for key in ('queue_running', 'queue_pending') for item in queue.get(key, ())}
+        except Exception as e:
+            debug("获取ComfyUI队列失败: %s", e)
+            return None
 
-        except requests.exceptions.ConnectionError:
-            # 特别处理连接错误，这通常表示ComfyUI服务宕机
-            consecutive_failures += 1
-            error(f"ComfyUI服务连接失败（第{consecutive_failures}次）: 服务器可能已宕机")
+    async def _run_blocking(self, func: Callable, *args, **kwargs):
+        """在有界线程池中执行阻塞调用并等待结果"""
+        return await self._loop.run_in_executor(self._io_pool, functools.partial(func, *args, **kwargs))
 
-            # 更新连续失败计数
-            with self.checking_tasks_lock:
-                if task_id in self.checking_tasks:
-                    self.checking_tasks[task_id]['consecutive_failures'] = consecutive_failures
+    async def _check_workflow_status(self, task_id: str, history: Optional[dict] = None,
+                                     queued: Optional[Set[str]] = None):
+        """
+        检查工作流状态的核心方法：解析历史记录后交给对应的结束/重试方法处理
 
-            # 如果连续失败次数过多，视为服务宕机
-            if consecutive_failures >= max_consecutive_failures:
-                error(f"连续{max_consecutive_failures}次连接ComfyUI服务失败，确认服务器已宕机")
+        Args:
+            task_id: 任务ID
+            history: 批量查询得到的历史记录，为None时单独查询该任务的 /history/{prompt_id}
+            queued: 与批量历史记录配套查询的队列中prompt_id集合，为None时不做交叉检查
+        """
+        task_info = self.checking_tasks.get(task_id)
+        if task_info is None:
+            debug("任务ID %s 不在检查任务列表中，跳过检查", task_id)
+            return
 
-                # 执行完成回调，标记为失败
-                self.callback_with_complete(task_id, prompt_id, False, output_name
-                                            , "ComfyUI服务连接失败，服务器可能已宕机", on_complete)
+        # 检查是否超时
+        if time.monotonic() - task_info.start_time > task_info.timeout_seconds:
+            await self._timeout_finish(task_id, task_info)
+            return
 
+        prompt_id = task_info.prompt_id
+        try:
+            if history is None:
+                # 发送请求检查工作流状态
+                response = await self._run_blocking(self._session.get, task_info.history_url, timeout=10)  # 增加超时时间到10秒
+                if response.status_code == 404:
+                    # 404表示prompt尚未进入历史记录，无需解析响应体
+                    self._retry_later(task_id, task_info, "prompt_id %s 不在历史记录中，可能仍在处理中", prompt_id)
+                    return
+                if response.status_code != 200:
+                    # 非200响应码，记录错误但继续尝试，并重置连续失败计数
+                    debug("获取历史记录失败，状态码: %s, 任务ID: %s, prompt_id: %s", response.status_code, task_id, prompt_id)
+                    task_info.consecutive_failures = 0
+                    return
+
+                history = _load_json(response)
+                if history == {}:
+                    # 空对象同样表示prompt尚未进入历史记录（按解析结果判断，不依赖content-length响应头，
+                    # 分块传输或压缩的响应没有该头或长度不同）
+                    self._retry_later(task_id, task_info, "prompt_id %s 不在历史记录中，可能仍在处理中", prompt_id)
+                    return
+
+            # 确保history和prompt_data是字典类型
+            if not isinstance(history, dict):
+                self._retry_later(task_id, task_info, "历史记录不是字典类型，而是: %s", type(history))
                 return
 
-            # 增加检查间隔但继续检查
-            with self.checking_tasks_lock:
-                if task_id in self.checking_tasks:
-                    self.checking_tasks[task_id]['check_interval'] = min(
-                        self.checking_tasks[task_id]['check_interval'] * 1.5, self.max_check_interval
-                    )
+            prompt_data = history.get(prompt_id)
+            if prompt_data is None and queued is not None and prompt_id not in queued:
+                # 两次请求之间刚好完成的任务也会落在这里，因此按失败计数，下一轮在历史记录中找到即正常结束；
+                # 只有连续多次找不到才放弃，在队列或历史记录中看到任务时计数清零
+                await self._record_failure(task_id, task_info, f"prompt_id {prompt_id} 既不在队列中也不在历史记录中（第{{}}次）",
+                                           "连续{}次在ComfyUI中找不到该任务，可能已丢失",
+                                           "ComfyUI队列和历史记录中都找不到该任务，可能服务已重启")
+            elif prompt_data is None:
+                if queued is not None:
+                    # 确认仍在ComfyUI队列中，之前偶发的查找失败或连接错误不再累计
+                    task_info.consecutive_failures = 0
+                self._retry_later(task_id, task_info, "prompt_id %s 不在历史记录中，可能仍在处理中", prompt_id)
+            elif not isinstance(prompt_data, dict):
+                self._retry_later(task_id, task_info, "prompt_data不是字典类型，而是: %s", type(prompt_data))
+            elif "outputs" in prompt_data:
+                await self._finish_success(task_id, task_info, prompt_data['outputs'])
+            elif "error" in prompt_data:
+                debug("工作流执行出错，任务ID: %s, prompt_id: %s, 错误: %s", task_id, prompt_id, prompt_data['error'])
+                await self._finish_failure(task_id, task_info, f"工作流执行出错，任务ID: {task_id}, 错误: {prompt_data['error']}")
+            else:
+                # 工作流仍在执行中，连续失败计数只统计连续的失败，看到任务后清零
+                task_info.consecutive_failures = 0
+                self._retry_later(task_id, task_info)
 
-            self._schedule_check(task_id)
         except Exception as e:
-            consecutive_failures += 1
-            error(f"检查工作流状态时出错（第{consecutive_failures}次）: {str(e)}")
-            print_log_exception()
+            # 两类失败的计数逻辑相同，只有日志和回调消息不同；连接错误通常表示ComfyUI服务宕机，不打印堆栈
+            if isinstance(e, requests.exceptions.ConnectionError):
+                messages = ("ComfyUI服务连接失败（第{}次）: 服务器可能已宕机",
+                            "连续{}次连接ComfyUI服务失败，确认服务器已宕机",
+                            "ComfyUI服务连接失败，服务器可能已宕机")
+            else:
+                print_log_exception()
+                messages = (f"检查工作流状态时出错（第{{}}次）: {str(e)}",
+                            "连续{}次检查工作流状态失败，认为连接失败",
+                            "检查工作流状态失败，可能连接有问题，请检查ComfyUI服务是否正常运行")
+            await self._record_failure(task_id, task_info, *messages)
+
+    async def _finish_success(self, task_id: str, task_info: TaskInfo, outputs: dict):
+        """工作流处理完成：统计输出文件并执行成功回调"""
+        if not self._claim(task_id):
+            return
+        # {'9': {'images': [{'filename': 'ComfyUI_00055_.png', 'subfolder': '', 'type': 'output'}]}}
+        debug("工作流处理完成，任务ID: %s, prompt_id: %s, 输出: %s", task_id, task_info.prompt_id, outputs)
+
+        file_num = 0
+        file_name = '图像文件'
+        for value in outputs.values():
+            output_key, file_name = next(((key, name) for key, name in OUTPUT_KINDS if key in value), ('text', '文本'))
+            file_num += len(value.get(output_key, []))
+
+        # 执行完成回调，标记为成功
+        await self._run_blocking(self.callback_with_complete, task_id, task_info.prompt_id, True,
+                                 task_info.output_name, f"共生成 {file_num} 个 {file_name} ", task_info.on_complete,
+                                 task_info.status_task_id)
+
+    async def _finish_failure(self, task_id: str, task_info: TaskInfo, msg: str):
+        """执行完成回调，标记为失败"""
+        if not self._claim(task_id):
+            return
+        await self._run_blocking(self.callback_with_complete, task_id, task_info.prompt_id, False,
+                                 task_info.output_name, msg, task_info.on_complete, task_info.status_task_id)
 
-            # 更新连续失败计数
-            with self.checking_tasks_lock:
-                if task_id in self.checking_tasks:
-                    self.checking_tasks[task_id]['consecutive_failures'] = consecutive_failures
+    def _claim(self, task_id: str) -> bool:
+        """
+        将任务移出检查列表，保证推送触发的检查和轮询同时发现结束时只回调一次
 
-            # 如果连续失败次数过多，视为连接失败
-            if consecutive_failures >= max_consecutive_failures:
-                error(f"连续{max_consecutive_failures}次检查工作流状态失败，认为连接失败")
+        Returns:
+            bool: 本次调用是否成功取得该任务
+        """
+        return self.checking_tasks.pop(task_id, None) is not None
 
-                # 执行完成回调，标记为失败
-                self.callback_with_complete(task_id, prompt_id, False, output_name
-                                            , "检查工作流状态失败，可能连接有问题，请检查ComfyUI服务是否正常运行", on_complete)
-                return
+    def _retry_later(self, task_id: str, task_info: TaskInfo, reason: str = None, *args):
+        """工作流尚未结束：增加检查间隔，等待下一轮检查；reason为日志模板，args在输出时才格式化"""
+        if reason:
+            debug(reason, *args)
+        self._grow_interval(task_info)
+
+    async def _timeout_finish(self, task_id: str, task_info: TaskInfo):
+        """工作流状态检查超时：执行超时回调并移除任务"""
+        if not self._claim(task_id):
+            return
+        debug("工作流状态检查超时，任务ID: %s, prompt_id: %s", task_id, task_info.prompt_id)
+        await self._run_blocking(self.callback_with_timeout, task_id, task_info.prompt_id, task_info.on_timeout)
+
+    async def _record_failure(self, task_id: str, task_info: TaskInfo, failure_log: str, give_up_log: str, give_up_msg: str):
+        """
+        记录一次检查失败，连续失败次数达到上限时按失败结束任务，否则稍后重试
 
-            # 增加检查间隔但继续检查
-            with self.checking_tasks_lock:
-                if task_id in self.checking_tasks:
-                    self.checking_tasks[task_id]['check_interval'] = min(
-                        self.checking_tasks[task_id]['check_interval'] * 1.5, self.max_check_interval
-                    )
+        Args:
+            task_id: 任务ID
+            task_info: 任务信息
+            failure_log: 本次失败的日志模板，{}处填入连续失败次数
+            give_up_log: 放弃检查时的日志模板，{}处填入连续失败次数上限
+            give_up_msg: 放弃检查时传给完成回调的消息
+        """
+        task_info.consecutive_failures += 1
+        error(failure_log.format(task_info.consecutive_failures))
+
+        if task_info.consecutive_failures >= task_info.max_consecutive_failures:
+            error(give_up_log.format(task_info.max_consecutive_failures))
+            await self._finish_failure(task_id, task_info, give_up_msg)
+            return
 
-            self._schedule_check(task_id)
+        self._retry_later(task_id, task_info)
 
-    def callback_with_complete(self, task_id: str, prompt_id: str, success: bool, output_name: str, msg: str, on_complete):
+    def _grow_interval(self, task_info: TaskInfo):
+        """按退避倍数增加检查间隔（不超过最大间隔），并加入±10%的随机抖动，避免同一批提交的任务同步轮询"""
+        task_info.check_interval = min(task_info.check_interval * self._backoff * random.uniform(0.9, 1.1),
+                                       self.max_check_interval)
 
-        # 执行完成回调，标记为失败
+    def callback_with_timeout(self, task_id: str, prompt_id: str, on_timeout):
+        """执行超时回调并移除任务"""
         try:
-            callback_with_args = functools.partial(
-                on_complete,
-                task_id,
-                prompt_id,
-                success,
-                output_name,
-                msg
-            )
-
-            weak_callback = weakref.ref(callback_with_args)
-            # 调用弱引用回调
-            if weak_callback() is not None:
-                weak_callback()()
-            else:
-                warning("weak_callback_complete 对象已被垃圾回收")
+            if on_timeout:
+                on_timeout(task_id, prompt_id)
+        except Exception as e:
+            error(f"执行超时回调时出错: {str(e)}")
+            print_log_exception()
 
-            # 通过WebSocket推送任务状态更新
-            try:
-                # 从task_id中提取原始任务ID（去掉可能的前缀）
-                original_task_id = task_id
-                if task_id.startswith('check_'):
-                    parts = task_id.split('_', 2)
-                    if len(parts) > 2:
-                        # 尝试从剩余部分中提取原始任务ID
-                        # 假设格式为 'check_promptId_timestamp'
-                        potential_task_id = parts[1]  # 使用prompt_id作为任务标识
-                        original_task_id = potential_task_id
-                
-                emit_task_status_update(original_task_id, {
-                    'task_id': original_task_id,
-                    'prompt_id': prompt_id,
-                    'status': 'completed' if success else 'failed',
-                    'message': msg,
-                    'output_name': output_name,
-                    'completion_time': time.time(),
-                    'progress': 100 if success else 0
-                })
-                debug(f"通过WebSocket推送工作流状态更新: {original_task_id}, 状态: {'completed' if success else 'failed'}")
-            except Exception as e:
-                error(f"推送工作流状态更新失败: {str(e)}")
+        # 移除任务
+        self.checking_tasks.pop(task_id, None)
+
+    def callback_with_complete(self, task_id: str, prompt_id: str, success: bool, output_name: str, msg: str, on_complete,
+                               status_task_id: str = None):
+        """执行完成回调，推送任务状态更新并移除任务"""
+        try:
+            if on_complete:
+                on_complete(task_id, prompt_id, success, output_name, msg)
+
+            # 通过WebSocket推送任务状态更新：只入队，由后台推送线程实际发送
+            # 使用注册检查时记录的原始任务ID，不再解析内部生成的 'check_promptId_timestamp'
+            original_task_id = status_task_id or task_id
+            self._emit_queue.put((original_task_id, {
+                'task_id': original_task_id,
+                'prompt_id': prompt_id,
+                'status': 'completed' if success else 'failed',
+                'message': msg,
+                'output_name': output_name,
+                'completion_time': time.time(),
+                'progress': 100 if success else 0
+            }))
 
             # 移除任务
-            with self.checking_tasks_lock:
-                self.checking_tasks.pop(task_id, None)
+            self.checking_tasks.pop(task_id, None)
 
         except Exception as e:
-            error(f"weak_callback_complete 执行完成回调时出错: {str(e)}")
+            error(f"执行完成回调时出错: {str(e)}")
             print_log_exception()
 
     def cancel_check(self, task_id: str) -> bool:
@@ -379,14 +574,13 @@ class WorkflowStatusChecker:
         Returns:
             bool: 是否成功取消
         """
-        with self.checking_tasks_lock:
-            if task_id in self.checking_tasks:
-                self.checking_tasks.pop(task_id, None)
-                debug(f"已取消工作流状态检查，任务ID: {task_id}")
-                return True
+        # 已调度的检查协程醒来后发现任务不在列表中会自动跳过
+        if self.checking_tasks.pop(task_id, None) is not None:
+            debug(f"已取消工作流状态检查，任务ID: {task_id}")
+            return True
 
-            debug(f"未找到要取消的工作流状态检查任务，任务ID: {task_id}")
-            return False
+        debug(f"未找到要取消的工作流状态检查任务，任务ID: {task_id}")
+        return False
 
     def get_checking_tasks_count(self) -> int:
         """
@@ -395,16 +589,45 @@ class WorkflowStatusChecker:
         Returns:
             int: 任务数量
         """
-        with self.checking_tasks_lock:
-            return len(self.checking_tasks)
+        return len(self.checking_tasks)
 
     def shutdown(self):
         """关闭检查器，清除所有检查任务"""
-        with self.checking_tasks_lock:
-            task_count = len(self.checking_tasks)
-            self.checking_tasks.clear()
-            debug(f"已关闭工作流状态检查器，清除了 {task_count} 个检查任务")
-
-
-# 创建全局工作流状态检查器实例
-workflow_status_checker = WorkflowStatusChecker()
+        task_count = len(self.checking_tasks)
+        self.checking_tasks.clear()
+        debug(f"已关闭工作流状态检查器，清除了 {task_count} 个检查任务")
+
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._io_pool.shutdown(wait=False)
+        self._emit_queue.put(None)
+        self._session.close()
+        # 清除全局实例，之后再调用get_workflow_status_checker()会创建新的检查器，而不是返回已关闭的实例
+        global _checker
+        with _checker_lock:
+            if _checker is self:
+                _checker = None
+
+
+# 全局工作流状态检查器实例及保护其创建的锁
+_checker: Optional[WorkflowStatusChecker] = None
+_checker_lock = threading.Lock()
+
+
+def get_workflow_status_checker() -> WorkflowStatusChecker:
+    """
+    获取全局工作流状态检查器实例
+
+    首次调用时才创建（同时启动后台事件循环线程），之后始终返回同一个实例；
+    创建过程加锁，多个线程同时首次调用时也只会创建一个检查器
+
+    Returns:
+        WorkflowStatusChecker: 全局工作流状态检查器
+    """
+    global _checker
+    checker = _checker
+    if checker is None:
+        with _checker_lock:
+            if _checker is None:
+                _checker = WorkflowStatusChecker()
+            checker = _checker
+    return checker
@@ -5,18 +5,74 @@
 @Author: HengLine
 @Time: 2025/08 - 2025/11
 """
+import copy
+import functools
 import json
 import os
+import tempfile
+
+# 尝试导入orjson库，解析和序列化配置文件比标准库更快；未安装时回退到标准库json
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
 from hengline.logger import error, debug
+from utils.file_utils import DEFAULT_FILE_MODE
 
 # 全局配置变量
 _config = None
 
+# 配置文件路径在导入时计算一次（本文件位于项目根目录的utils目录下）
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_CONFIGS_DIR = os.path.join(_PROJECT_ROOT, 'configs')
+_CONFIG_PATH = os.path.join(_CONFIGS_DIR, 'config.json')
+_WORKFLOW_PRESETS_PATH = os.path.join(_CONFIGS_DIR, 'workflow_presets.json')
+
+
+def write_json_file(file_path, data):
+    """原子地写入JSON配置文件：先写入同目录下的临时文件再替换原文件，写入中途出错不会留下损坏的配置
+
+    Args:
+        file_path (str): 目标文件路径
+        data: 要写入的数据
+    """
+    # 临时文件名由mkstemp生成，多个进程或线程同时写入同一个配置时不会互相覆盖对方的临时文件
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path) or '.', suffix='.tmp')
+    try:
+        if HAS_ORJSON:
+            # orjson直接输出UTF-8字节，省去字符串编码
+            with os.fdopen(fd, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+        # mkstemp创建的文件权限为0600，替换前沿用原文件的权限，新文件使用默认权限
+        try:
+            mode = os.stat(file_path).st_mode & 0o777
+        except FileNotFoundError:
+            mode = DEFAULT_FILE_MODE
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _read_json_file(file_path):
+    """读取并解析JSON文件，优先使用orjson"""
+    if HAS_ORJSON:
+        with open(file_path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
 
 def _get_config_path():
     """获取配置文件路径"""
-    return os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'configs', 'config.json')
+    return _CONFIG_PATH
 
 
 def load_config():
@@ -27,10 +83,9 @@ def load_config():
 
     config_path = _get_config_path()
     try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            _config = json.load(f)
-            debug(f"成功加载配置文件: {config_path}")
-            return _config
+        _config = _read_json_file(config_path)
+        debug(f"成功加载配置文件: {config_path}")
+        return _config
     except Exception as e:
         error(f"加载配置文件失败: {str(e)}")
         # 如果加载失败，返回默认配置
@@ -155,16 +210,20 @@ def save_comfyui_config(api_url=None, auto_start_server=None):
         # 确保comfyui节点存在
         if 'comfyui' not in config['settings']:
             config['settings']['comfyui'] = {}
+        comfyui_config = config['settings']['comfyui']
+
+        # 配置没有变化时不重写文件
+        updates = {key: value for key, value in (('api_url', api_url), ('auto_start_server', auto_start_server))
+                   if value is not None}
+        if all(key in comfyui_config and comfyui_config[key] == value for key, value in updates.items()):
+            debug(f"ComfyUI配置没有变化，跳过保存: {comfyui_config}")
+            return True
 
         # 更新配置
-        if api_url is not None:
-            config['settings']['comfyui']['api_url'] = api_url
-        if auto_start_server is not None:
-            config['settings']['comfyui']['auto_start_server'] = auto_start_server
+        comfyui_config.update(updates)
 
         # 写回文件
-        with open(config_path, 'w', encoding='utf-8') as f:
-            json.dump(config, f, ensure_ascii=False, indent=2)
+        write_json_file(config_path, config)
 
         # 重新加载配置
         reload_config()
@@ -272,19 +331,40 @@ def get_workflows_config():
     })
 
 
-# 加载工作流预设
-def load_workflow_presets():
-    """加载工作流预设配置"""
-    presets_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'configs',
-                                'workflow_presets.json')
+@functools.lru_cache(maxsize=4)
+def _load_workflow_presets_cached(presets_path, mtime):
+    """
+    解析工作流预设文件，按(路径, 修改时间)缓存，文件被修改后自动重新解析
+
+    返回值由所有调用方共享，不可直接修改
+    """
+    return _read_json_file(presets_path)
+
+
+def _get_workflow_presets():
+    """获取共享的工作流预设配置（只读），加载失败时返回空字典"""
+    presets_path = _WORKFLOW_PRESETS_PATH
     try:
-        with open(presets_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return _load_workflow_presets_cached(presets_path, os.stat(presets_path).st_mtime_ns)
     except Exception as e:
         error(f"加载工作流预设失败: {e}")
         # 返回默认预设
-        return {
-        }
+        return {}
+
+
+def _get_preset_section(task_type, preset_type='setting'):
+    """获取指定任务类型的预设配置（只读，不复制）"""
+    presets = _get_workflow_presets()
+    # 如果请求的是setting但为空，则返回default
+    if preset_type == 'setting' and not presets.get(task_type, {}).get('setting', {}):
+        return presets.get(task_type, {}).get('default', {})
+    return presets.get(task_type, {}).get(preset_type, {})
+
+
+# 加载工作流预设
+def load_workflow_presets():
+    """加载工作流预设配置，返回可自由修改的副本"""
+    return copy.deepcopy(_get_workflow_presets())
 
 
 def get_workflow_preset(task_type, preset_type='setting'):
@@ -295,13 +375,9 @@ def get_workflow_preset(task_type, preset_type='setting'):
         preset_type (str): 预设类型，'setting'或'default'
         
     Returns:
-        dict: 预设配置
+        dict: 预设配置（副本）
     """
-    presets = load_workflow_presets()
-    # 如果请求的是setting但为空，则返回default
-    if preset_type == 'setting' and not presets.get(task_type, {}).get('setting', {}):
-        return presets.get(task_type, {}).get('default', {})
-    return presets.get(task_type, {}).get(preset_type, {})
+    return copy.deepcopy(_get_preset_section(task_type, preset_type))
 
 
 def save_workflow_preset(task_type, config):
@@ -315,8 +391,7 @@ def save_workflow_preset(task_type, config):
         bool: 保存是否成功
     """
     try:
-        presets_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'configs',
-                                    'workflow_presets.json')
+        presets_path = _WORKFLOW_PRESETS_PATH
         presets = load_workflow_presets()
 
         # 确保任务类型存在
@@ -334,12 +409,15 @@ def save_workflow_preset(task_type, config):
         if task_type == 'image_to_image' and 'sampler' in config_copy:
             del config_copy['sampler']
 
+        # 配置没有变化时不重写文件
+        if presets[task_type].get('setting') == config_copy:
+            return True
+
         # 保存到setting节点
         presets[task_type]['setting'] = config_copy
 
         # 写回文件
-        with open(presets_path, 'w', encoding='utf-8') as f:
-            json.dump(presets, f, ensure_ascii=False, indent=2)
+        write_json_file(presets_path, presets)
 
         return True
     except Exception as e:
@@ -357,8 +435,7 @@ def reset_workflow_preset(task_type):
         bool: 重置是否成功
     """
     try:
-        presets_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'configs',
-                                    'workflow_presets.json')
+        presets_path = _WORKFLOW_PRESETS_PATH
         presets = load_workflow_presets()
 
         # 确保任务类型存在
@@ -367,8 +444,7 @@ def reset_workflow_preset(task_type):
             presets[task_type]['setting'] = {}
 
             # 写回文件
-            with open(presets_path, 'w', encoding='utf-8') as f:
-                json.dump(presets, f, ensure_ascii=False, indent=2)
+            write_json_file(presets_path, presets)
 
         return True
     except Exception as e:
@@ -386,25 +462,16 @@ def get_effective_config(task_type, **kwargs):
     Returns:
         dict: 最终的有效配置
     """
-    # 获取默认配置
-    default_config = get_workflow_preset(task_type, 'default')
-    # 获取用户设置配置
-    setting_config = get_workflow_preset(task_type, 'setting')
-
-    # 创建结果配置，先使用默认配置
-    result_config = default_config.copy()
-
-    # 用用户设置覆盖默认配置
-    for key, value in setting_config.items():
-        if value is not None and value != '':
-            result_config[key] = value
-
-    # 用页面输入覆盖前面的配置
-    for key, value in kwargs.items():
-        if value is not None and value != '':
-            result_config[key] = value
-
-    return result_config
+    # 获取默认配置和用户设置配置（只读，合并时会生成新字典，无需复制）
+    default_config = _get_preset_section(task_type, 'default')
+    setting_config = _get_preset_section(task_type, 'setting')
+
+    # 一次性合并：默认配置 < 用户设置 < 页面输入，忽略None和空字符串
+    return {
+        **default_config,
+        **{key: value for key, value in setting_config.items() if value is not None and value != ''},
+        **{key: value for key, value in kwargs.items() if value is not None and value != ''},
+    }
 
 
 def get_workflow_path(task_type):
@@ -6,16 +6,36 @@
 @Author: HengLine
 @Time: 2025/08 - 2025/11
 """
+import hashlib
+import itertools
 import os
+import tempfile
 import time
-import uuid
 from pathlib import Path
 
-from werkzeug.utils import secure_filename
-
 # 允许上传的文件类型
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
 
+# 有效图片文件的扩展名
+IMAGE_EXTENSIONS = frozenset({'.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff'})
+
+# 输出文件名的12位十六进制后缀：前8位是导入时读取的32位随机数（区分进程，多个worker进程间几乎不会重复），
+# 后4位为进程内递增计数，生成文件名时无需再调用uuid4读取系统随机数
+_OUTPUT_NAME_PREFIX = f"{int.from_bytes(os.urandom(4), 'big'):08x}"
+_output_name_counter = itertools.count(int.from_bytes(os.urandom(2), 'big'))
+
+# 通过临时文件写入后重命名的文件使用的权限：NamedTemporaryFile/mkstemp创建的文件固定为0600，重命名前改为常规的0644。
+# 使用固定值而不是读取umask：os.umask只能通过临时设置新值读取，期间其他线程创建的文件会得到错误的权限
+DEFAULT_FILE_MODE = 0o644
+
+# 任务类型 -> 输出文件扩展名
+_OUTPUT_EXTENSIONS = {
+    'text_to_video': '.mp4',
+    'image_to_video': '.mp4',
+    'image_to_image': '.png',
+    'image_to_image_v2': '.png',
+}
+
 
 # 检查文件类型是否允许上传
 def allowed_file(filename):
@@ -26,24 +46,47 @@ def allowed_file(filename):
 
 # 保存上传的文件
 def save_uploaded_file(file, upload_folder):
-    """保存上传的文件"""
+    """
+    保存上传的文件，以文件内容的BLAKE2b摘要命名，重复上传同一个文件时不再重复写入
+
+    Args:
+        file: 上传的文件（werkzeug FileStorage）
+        upload_folder: 保存目录
+
+    Returns:
+        str: 保存后的文件路径，文件类型不允许时返回None
+    """
     if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
-        file_path = os.path.join(upload_folder, filename)
-        file.save(file_path)
+        # 扩展名已由allowed_file校验，文件名由内容摘要生成，不再使用原文件名
+        ext = '.' + file.filename.rsplit('.', 1)[1].lower()
+        hasher = hashlib.blake2b(digest_size=16)
+        # 按1MB分块流式写入临时文件，同时计算摘要，只读取一遍上传内容
+        out = tempfile.NamedTemporaryFile(dir=upload_folder, suffix='.part', delete=False)
+        try:
+            with out:
+                for chunk in iter(lambda: file.stream.read(1024 * 1024), b''):
+                    hasher.update(chunk)
+                    out.write(chunk)
+            file_path = os.path.join(upload_folder, f"{hasher.hexdigest()}{ext}")
+            if os.path.exists(file_path):
+                # 相同内容的文件已经保存过，直接复用
+                os.remove(out.name)
+            else:
+                os.chmod(out.name, DEFAULT_FILE_MODE)
+                os.replace(out.name, file_path)
+        except BaseException:
+            # 读取或写入中断（例如客户端断开、磁盘已满）时删除未完成的临时文件
+            if os.path.exists(out.name):
+                os.remove(out.name)
+            raise
         return file_path
     return None
 
 
 def generate_output_filename(task_type):
     """生成输出文件名"""
-    name = f"{task_type}_{int(time.time())}_{uuid.uuid4().hex[:8]}"
-    if task_type in ['text_to_video', 'image_to_video']:
-        name = name + ".mp4"
-    elif task_type in ['image_to_image', 'image_to_image_v2']:
-        name = name + ".png"
-
-    return name
+    suffix = f"{_OUTPUT_NAME_PREFIX}{next(_output_name_counter) & 0xffff:04x}"
+    return f"{task_type}_{time.time_ns() // 1_000_000_000}_{suffix}{_OUTPUT_EXTENSIONS.get(task_type, '')}"
 
 
 def is_valid_image_file(file_path: str) -> bool:
@@ -56,10 +99,8 @@ def is_valid_image_file(file_path: str) -> bool:
     Returns:
         bool: 是否为有效图片文件
     """
-    # 检查文件扩展名
-    valid_extensions = ['.png', '.jpg', '.jpeg', '.gif', '.bmp', '.tiff']
-    _, ext = os.path.splitext(file_path.lower())
-    return ext in valid_extensions
+    # 检查文件扩展名（只转换扩展名的大小写，不复制整个路径）
+    return os.path.splitext(file_path)[1].lower() in IMAGE_EXTENSIONS
 
 
 def file_exists(file_path):